@@ -1,23 +1,64 @@
 """Assistant chat API."""
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.schemas import AssistantChatRequest, AssistantChatResponse
+from app.schemas import (
+    AssistantChatRequest,
+    AssistantChatResponse,
+    CompletionCacheStats,
+    QueryCacheStats,
+)
 from app.services import AssistantService
+from app.services.completion_cache import get_completion_cache
+from app.services.embedding_cache import get_query_embedding_cache
 
 
 router = APIRouter()
 
 
 @router.post("/chat", response_model=AssistantChatResponse)
-def chat_with_assistant(
+async def chat_with_assistant(
     payload: AssistantChatRequest,
     db: Session = Depends(deps.get_db),
 ) -> AssistantChatResponse:
     """Send a message to the MindDock assistant."""
 
     service = AssistantService(db)
-    response = service.chat(payload)
+    response = await service.achat(payload)
     return response
+
+
+@router.post("/chat/stream")
+def stream_chat_with_assistant(
+    payload: AssistantChatRequest,
+    db: Session = Depends(deps.get_db),
+) -> StreamingResponse:
+    """Stream the assistant reply as Server-Sent Events.
+
+    The retrieved context is sent first as a ``context`` event, followed by
+    ``delta`` events with reply text and a final ``done`` event.
+    """
+
+    events = AssistantService(db).chat_stream(payload)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/query-cache", response_model=QueryCacheStats)
+def query_cache_stats() -> QueryCacheStats:
+    """Hit-rate counters of the query embedding cache in this process."""
+
+    return QueryCacheStats(**get_query_embedding_cache().stats())
+
+
+@router.get("/completion-cache", response_model=CompletionCacheStats)
+def completion_cache_stats() -> CompletionCacheStats:
+    """Hit-rate counters of the assistant completion cache in this process."""
+
+    return CompletionCacheStats(**get_completion_cache().stats())
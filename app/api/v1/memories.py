@@ -15,6 +15,7 @@ from fastapi import (
     UploadFile,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api import deps
@@ -79,7 +80,7 @@ async def create_memory_from_audio(
 
     transcriber = TranscriptionService()
     try:
-        transcription = transcriber.transcribe_audio(
+        transcription = await transcriber.atranscribe_audio(
             audio_bytes,
             filename=file.filename,
             content_type=file.content_type,
@@ -120,16 +121,8 @@ async def create_memory_from_audio(
         context=context_payload,
     )
 
-    memory_service = MemoryService(db)
-    memory = memory_service.create_memory(memory_payload)
-
-    # Reset file pointer so we can persist the original audio as an attachment.
-    file.file.seek(0)
-    attachment_service = AttachmentService(db)
-    attachment_service.save_attachment(memory.id, file)
-
-    refreshed = memory_service.get_memory(memory.id)
-    return MemoryReadWithAttachments.model_validate(refreshed)
+    # Database and file writes are blocking; keep them off the event loop.
+    return await run_in_threadpool(_store_transcribed_memory, db, memory_payload, file)
 
 
 @router.get("/{memory_id}", response_model=MemoryReadWithAttachments)
@@ -170,6 +163,21 @@ def delete_memory(memory_id: uuid.UUID, db: Session = Depends(deps.get_db)) -> N
     service.delete_memory(memory)
 
 
+def _store_transcribed_memory(
+    db: Session, memory_payload: MemoryCreate, file: UploadFile
+) -> MemoryReadWithAttachments:
+    memory_service = MemoryService(db)
+    memory = memory_service.create_memory(memory_payload)
+
+    # Reset file pointer so we can persist the original audio as an attachment.
+    file.file.seek(0)
+    attachment_service = AttachmentService(db)
+    attachment_service.save_attachment(memory.id, file)
+
+    refreshed = memory_service.get_memory(memory.id)
+    return MemoryReadWithAttachments.model_validate(refreshed)
+
+
 def _parse_tags(raw: str | None) -> list[str] | None:
     if not raw:
         return None
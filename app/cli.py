@@ -0,0 +1,262 @@
+"""Command-line maintenance tasks for MindDock.
+
+Usage:
+    python -m app.cli reindex [--owner UUID] [--since ISO8601] [...]
+    python -m app.cli fit-projection --dim N [--sample ROWS]
+    python -m app.cli reproject [--owner UUID] [--batch-size N]
+    python -m app.cli compact-vectors [--owner UUID] [--force]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import get_settings
+from app.database import SessionLocal, init_db
+from app.repositories import MemoryRepository
+from app.repositories.vector_store import get_vector_store
+from app.services.rag_service import RAGService
+
+
+def _log(message: str) -> None:
+    print(f"[minddock] {message}", flush=True)
+
+
+def _parse_since(raw: str | None) -> datetime | None:
+    if not raw:
+        return None
+    parsed = datetime.fromisoformat(raw)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class ReindexCheckpoint:
+    """JSON checkpoint holding the last fully indexed memory id for a filter set."""
+
+    def __init__(self, path: Path, filters: dict[str, str | None]):
+        self.path = path
+        self.filters = filters
+
+    def load(self) -> tuple[uuid.UUID | None, int]:
+        if not self.path.exists():
+            return None, 0
+        data = json.loads(self.path.read_text())
+        if data.get("filters") != self.filters:
+            _log("Checkpoint was written for different filters; starting over")
+            return None, 0
+        last_id = data.get("last_id")
+        return (uuid.UUID(last_id) if last_id else None), int(data.get("processed", 0))
+
+    def save(self, last_id: uuid.UUID, processed: int) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {"filters": self.filters, "last_id": str(last_id), "processed": processed}
+            )
+        )
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _index_chunk(memory_ids: list[uuid.UUID], force: bool) -> int:
+    session = SessionLocal()
+    try:
+        memories = MemoryRepository(session).get_many(memory_ids)
+        return RAGService(session).index_memories(memories, force=force)
+    finally:
+        session.close()
+
+
+def reindex(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    owner_id = uuid.UUID(args.owner) if args.owner else None
+    since = _parse_since(args.since)
+    batch_size = args.batch_size or settings.rag_embedding_batch_size
+    checkpoint = ReindexCheckpoint(
+        Path(args.checkpoint) if args.checkpoint else settings.storage_dir / "reindex.checkpoint.json",
+        {"owner": args.owner, "since": since.isoformat() if since else None},
+    )
+    if args.restart:
+        checkpoint.clear()
+    cursor, processed = checkpoint.load()
+    if cursor is not None:
+        _log(f"Resuming after {cursor} ({processed} memories already processed)")
+
+    embedded = 0
+    started = time.monotonic()
+    last_report = started
+    # Chunks complete out of order; the checkpoint only advances past the
+    # longest prefix of finished chunks so a resume never skips work.
+    in_flight: deque[tuple[uuid.UUID, int, Future[int]]] = deque()
+    session = SessionLocal()
+    try:
+        repo = MemoryRepository(session)
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            exhausted = False
+            while not exhausted or in_flight:
+                while not exhausted and len(in_flight) < args.workers * 2:
+                    memory_ids = repo.list_ids_after(
+                        cursor, limit=batch_size, owner_id=owner_id, since=since
+                    )
+                    if not memory_ids:
+                        exhausted = True
+                        break
+                    cursor = memory_ids[-1]
+                    in_flight.append(
+                        (cursor, len(memory_ids), pool.submit(_index_chunk, memory_ids, args.force))
+                    )
+
+                if not in_flight:
+                    break
+                last_id, count, future = in_flight.popleft()
+                embedded += future.result()
+                processed += count
+                checkpoint.save(last_id, processed)
+
+                now = time.monotonic()
+                if now - last_report >= args.report_every:
+                    rate = processed / max(now - started, 1e-9)
+                    _log(f"{processed} memories scanned, {embedded} embedded ({rate:.1f} rows/s)")
+                    last_report = now
+    finally:
+        session.close()
+
+    elapsed = time.monotonic() - started
+    checkpoint.clear()
+    _log(
+        f"Re-indexed {embedded} of {processed} memories in {elapsed:.1f}s "
+        f"({processed / max(elapsed, 1e-9):.1f} rows/s)"
+    )
+    return 0
+
+
+def fit_projection(args: argparse.Namespace) -> int:
+    session = SessionLocal()
+    try:
+        projection, kept = RAGService(session).fit_projection(
+            args.dim, sample_size=args.sample
+        )
+    except ValueError as exc:
+        _log(str(exc))
+        return 1
+    finally:
+        session.close()
+    _log(
+        f"Fitted {projection.input_dim} -> {projection.dim} projection for "
+        f"{projection.source} ({kept:.1%} of variance kept)"
+    )
+    settings = get_settings()
+    if settings.rag_embedding_dimensions != projection.dim:
+        _log(f"Set MINDDOCK_RAG_EMBEDDING_DIMENSIONS={projection.dim} to use it")
+    return 0
+
+
+def reproject(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    if not settings.rag_embedding_dimensions:
+        _log("MINDDOCK_RAG_EMBEDDING_DIMENSIONS is not set; nothing to re-project")
+        return 1
+    owner_id = uuid.UUID(args.owner) if args.owner else None
+    batch_size = args.batch_size or settings.rag_embedding_batch_size
+
+    cursor: uuid.UUID | None = None
+    scanned = converted = 0
+    started = time.monotonic()
+    session = SessionLocal()
+    try:
+        repo = MemoryRepository(session)
+        rag = RAGService(session)
+        while True:
+            memory_ids = repo.list_ids_after(cursor, limit=batch_size, owner_id=owner_id)
+            if not memory_ids:
+                break
+            cursor = memory_ids[-1]
+            converted += rag.reproject_memories(repo.get_many(memory_ids))
+            scanned += len(memory_ids)
+            session.expunge_all()
+    finally:
+        session.close()
+
+    _log(
+        f"Re-projected {converted} of {scanned} memories in "
+        f"{time.monotonic() - started:.1f}s; run `reindex` for any left over"
+    )
+    return 0
+
+
+def compact_vectors(args: argparse.Namespace) -> int:
+    store = get_vector_store()
+    if store is None:
+        _log("MINDDOCK_RAG_VECTOR_STORE is not mmap; nothing to compact")
+        return 0
+    owners = [uuid.UUID(args.owner)] if args.owner else store.owners()
+    started = time.monotonic()
+    removed = sum(store.compact(owner_id, force=args.force) for owner_id in owners)
+    _log(
+        f"Removed {removed} dead vector records for {len(owners)} owners in "
+        f"{time.monotonic() - started:.1f}s"
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="MindDock maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reindex_parser = commands.add_parser("reindex", help="Regenerate RAG embeddings")
+    reindex_parser.add_argument("--owner", help="Only reindex memories of this owner id")
+    reindex_parser.add_argument("--since", help="Only memories updated at or after this ISO8601 time")
+    reindex_parser.add_argument("--batch-size", type=int, default=None, help="Memories per embedding batch")
+    reindex_parser.add_argument("--workers", type=int, default=4, help="Parallel embedding workers")
+    reindex_parser.add_argument("--checkpoint", help="Checkpoint file (default: STORAGE_DIR/reindex.checkpoint.json)")
+    reindex_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    reindex_parser.add_argument("--force", action="store_true", help="Re-embed even if the content hash is unchanged")
+    reindex_parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress lines")
+    reindex_parser.set_defaults(handler=reindex)
+
+    fit_parser = commands.add_parser(
+        "fit-projection", help="Fit a PCA projection of stored embeddings"
+    )
+    fit_parser.add_argument("--dim", type=int, required=True, help="Target dimension")
+    fit_parser.add_argument("--sample", type=int, default=20000, help="Stored memories to fit on")
+    fit_parser.set_defaults(handler=fit_projection)
+
+    reproject_parser = commands.add_parser(
+        "reproject", help="Shrink stored embeddings to MINDDOCK_RAG_EMBEDDING_DIMENSIONS"
+    )
+    reproject_parser.add_argument("--owner", help="Only re-project memories of this owner id")
+    reproject_parser.add_argument("--batch-size", type=int, default=None, help="Memories per batch")
+    reproject_parser.set_defaults(handler=reproject)
+
+    compact_parser = commands.add_parser(
+        "compact-vectors", help="Drop deleted and replaced vectors from mmap vector files"
+    )
+    compact_parser.add_argument("--owner", help="Only compact this owner's files")
+    compact_parser.add_argument(
+        "--force", action="store_true", help="Rewrite files even with few dead records"
+    )
+    compact_parser.set_defaults(handler=compact_vectors)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = build_parser().parse_args(argv)
+    init_db()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
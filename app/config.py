@@ -2,6 +2,7 @@
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,10 +22,72 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"
     openai_embedding_model: str = "text-embedding-3-small"
     openai_transcription_model: str = "gpt-4o-transcribe"
+    openai_base_url: str | None = None
+    openai_max_connections: int = 200
+    openai_max_keepalive_connections: int = 50
+    openai_keepalive_expiry_seconds: float = 30.0
+    openai_http2: bool = True
+    openai_timeout_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 10.0
+    openai_max_retries: int = 2
+    openai_retry_budget_ratio: float = 0.1
+    openai_retry_budget_min: int = 10
+    assistant_context_max_tokens: int = 6000
+    assistant_history_ratio: float = 0.3
+    assistant_memory_min_tokens: int = 48
+    assistant_completion_cache_enabled: bool = False
+    assistant_completion_cache_size: int = 500
+    assistant_completion_cache_ttl_seconds: float = 3600.0
+    assistant_completion_cache_disk: bool = True
+    assistant_query_embed_threads: int = 40
     cors_allow_origins: list[str] = ["*"]
+    workflow_async_enabled: bool = True
+    workflow_workers: int = 2
+    workflow_queue_size: int = 1000
+    workflow_max_attempts: int = 3
+    workflow_retry_backoff_seconds: float = 0.5
+    workflow_shutdown_timeout_seconds: float = 30.0
+    workflow_outbox_enabled: bool = True
+    workflow_outbox_batch_size: int = 100
+    workflow_outbox_lease_seconds: float = 300.0
+    workflow_outbox_poll_seconds: float = 1.0
+    workflow_outbox_max_attempts: int = 10
+    workflow_outbox_retry_seconds: float = 30.0
     rag_enabled: bool = True
     rag_default_top_k: int = 3
     rag_local_vector_size: int = 512
+    rag_embedding_dimensions: int | None = None
+    rag_local_char_ngram: int = 2
+    rag_embedding_backend: Literal["auto", "openai", "onnx", "local"] = "auto"
+    rag_onnx_model_dir: Path | None = None
+    rag_onnx_threads: int = 0
+    rag_onnx_quantize: bool = False
+    rag_onnx_max_length: int = 256
+    rag_onnx_batch_tokens: int = 8192
+    rag_embedding_batch_size: int = 256
+    rag_chunk_size: int = 2000
+    rag_chunk_overlap: int = 200
+    rag_embedding_cache_enabled: bool = True
+    rag_embedding_cache_size: int = 10000
+    rag_embedding_cache_disk: bool = True
+    rag_embedding_cache_disk_max_entries: int = 200000
+    rag_query_cache_enabled: bool = True
+    rag_query_cache_size: int = 1000
+    rag_query_cache_ttl_seconds: float = 3600.0
+    rag_query_cache_disk: bool = False
+    rag_vector_store: Literal["database", "mmap"] = "database"
+    rag_vector_dtype: Literal["float32", "float16", "int8"] = "float32"
+    rag_rerank_candidates: int = 100
+    rag_cache_enabled: bool = True
+    rag_cache_max_bytes: int = 256 * 1024 * 1024
+    rag_index_type: Literal["exact", "ivf"] = "exact"
+    rag_ann_min_size: int = 20000
+    rag_ivf_nlist: int | None = None
+    rag_ivf_nprobe: int = 16
+    rag_retrieval_mode: Literal["vector", "hybrid"] = "vector"
+    rag_hybrid_candidates: int = 200
+    rag_hybrid_prefilter_min: int = 5000
+    rag_rrf_k: int = 60
 
     model_config = SettingsConfigDict(env_prefix="MINDDOCK_", env_file=".env")
 
@@ -1,6 +1,6 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.config import get_settings
@@ -21,6 +21,40 @@ engine = create_engine(  # type: ignore[assignment]
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+def add_missing_columns() -> None:
+    """Add nullable columns introduced after a table was first created.
+
+    ``create_all`` only creates missing tables, so additive schema changes
+    are applied here for existing databases.
+    """
+
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+
+
+def init_db() -> None:
+    """Create missing tables and columns; run by every entry point."""
+
+    import app.models  # noqa: F401 - registers the tables on ``Base.metadata``
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+
 def get_db_session():
     """Database session dependency for FastAPI."""
 
@@ -1,21 +1,53 @@
 """FastAPI application entry point for MindDock backend."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import api
 from app.config import get_settings
-from app.database import Base, engine
-from app.workflows import initialize_workflows
+from app.database import SessionLocal, init_db
+from app.services.openai_clients import close_openai_clients
+from app.services.rag_service import RAGService
+from app.workflows import OutboxDispatcher, initialize_workflows, workflow_engine
 
 
 def create_app() -> FastAPI:
     """Application factory."""
 
     settings = get_settings()
-    Base.metadata.create_all(bind=engine)
+    init_db()
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        with SessionLocal() as session:
+            RAGService(session).warn_unsearchable_embeddings()
+        if settings.workflow_async_enabled:
+            outbox = None
+            if settings.workflow_outbox_enabled:
+                outbox = OutboxDispatcher(
+                    workflow_engine,
+                    SessionLocal,
+                    batch_size=settings.workflow_outbox_batch_size,
+                    lease_seconds=settings.workflow_outbox_lease_seconds,
+                    poll_interval_seconds=settings.workflow_outbox_poll_seconds,
+                    max_attempts=settings.workflow_outbox_max_attempts,
+                    retry_delay_seconds=settings.workflow_outbox_retry_seconds,
+                )
+            workflow_engine.start(
+                SessionLocal,
+                workers=settings.workflow_workers,
+                max_pending=settings.workflow_queue_size,
+                max_attempts=settings.workflow_max_attempts,
+                backoff_seconds=settings.workflow_retry_backoff_seconds,
+                outbox=outbox,
+            )
+        yield
+        workflow_engine.shutdown(timeout=settings.workflow_shutdown_timeout_seconds)
+        await close_openai_clients()
 
-    app = FastAPI(title=settings.project_name)
+    app = FastAPI(title=settings.project_name, lifespan=lifespan)
     initialize_workflows()
 
     app.add_middleware(
@@ -4,5 +4,6 @@ from app.models.attachment import Attachment
 from app.models.memory import Memory
 from app.models.memory_embedding import MemoryEmbedding
 from app.models.user import User
+from app.models.workflow_event import WorkflowEvent
 
-__all__ = ["User", "Memory", "Attachment", "MemoryEmbedding"]
+__all__ = ["User", "Memory", "Attachment", "MemoryEmbedding", "WorkflowEvent"]
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -29,6 +29,15 @@ class MemoryEmbedding(Base):
     embedding_dim: Mapped[int] = mapped_column(Integer, nullable=False)
     embedding_dtype: Mapped[str] = mapped_column(String(16), nullable=False)
     embedding_model: Mapped[str] = mapped_column(String(100), nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String(64))
+    # Denormalized from the memory so search filters need no join.
+    tags: Mapped[list[str] | None] = mapped_column(JSON)
+    captured_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    source_device: Mapped[str | None] = mapped_column(String(100))
+    # [start, end) offsets into memory.content, one per chunk vector.
+    chunk_spans: Mapped[list[list[int]] | None] = mapped_column(JSON)
+    # Hash of the memory.content the spans were cut from.
+    chunk_content_hash: Mapped[str | None] = mapped_column(String(64))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
@@ -4,10 +4,15 @@ from app.repositories.attachment_repository import AttachmentRepository
 from app.repositories.memory_embedding_repository import MemoryEmbeddingRepository
 from app.repositories.memory_repository import MemoryRepository
 from app.repositories.user_repository import UserRepository
+from app.repositories.vector_store import MmapVectorStore, VectorStore
+from app.repositories.workflow_event_repository import WorkflowEventRepository
 
 __all__ = [
     "UserRepository",
     "MemoryRepository",
     "MemoryEmbeddingRepository",
     "AttachmentRepository",
+    "MmapVectorStore",
+    "VectorStore",
+    "WorkflowEventRepository",
 ]
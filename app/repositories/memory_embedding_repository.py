@@ -3,18 +3,32 @@
 from __future__ import annotations
 
 import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Sequence
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.models import MemoryEmbedding
+from app.repositories.vector_store import VectorStore, get_vector_store
 
 
 class MemoryEmbeddingRepository:
-    """Encapsulates CRUD operations for memory embeddings."""
+    """Encapsulates CRUD operations for memory embeddings.
+
+    Metadata always lives in ``memory_embeddings``; when an external
+    ``vector_store`` is configured the vector payload is written there and the
+    row's ``embedding`` blob is left empty. A chunked memory stores one
+    ``embedding_dim`` vector per chunk back to back in the same payload, with
+    the chunks' character spans in ``chunk_spans``.
+    """
 
     def __init__(self, session: Session):
         self.session = session
+        self.vector_store: VectorStore | None = get_vector_store()
 
     def upsert(
         self,
@@ -25,13 +39,32 @@ class MemoryEmbeddingRepository:
         embedding_dim: int,
         embedding_dtype: str,
         embedding_model: str,
+        content_hash: str | None = None,
+        tags: list[str] | None = None,
+        captured_at: datetime | None = None,
+        source_device: str | None = None,
+        chunk_spans: list[list[int]] | None = None,
+        chunk_content_hash: str | None = None,
     ) -> MemoryEmbedding:
+        vectors = None
+        if self.vector_store is not None:
+            vectors = np.frombuffer(embedding_bytes, dtype=np.dtype(embedding_dtype)).reshape(
+                -1, embedding_dim
+            )
+            embedding_bytes = b""
+
         record = self.session.get(MemoryEmbedding, memory_id)
         if record:
             record.embedding = embedding_bytes
             record.embedding_dim = embedding_dim
             record.embedding_dtype = embedding_dtype
             record.embedding_model = embedding_model
+            record.content_hash = content_hash
+            record.tags = tags
+            record.captured_at = captured_at
+            record.source_device = source_device
+            record.chunk_spans = chunk_spans
+            record.chunk_content_hash = chunk_content_hash
         else:
             record = MemoryEmbedding(
                 memory_id=memory_id,
@@ -40,24 +73,283 @@ class MemoryEmbeddingRepository:
                 embedding_dim=embedding_dim,
                 embedding_dtype=embedding_dtype,
                 embedding_model=embedding_model,
+                content_hash=content_hash,
+                tags=tags,
+                captured_at=captured_at,
+                source_device=source_device,
+                chunk_spans=chunk_spans,
+                chunk_content_hash=chunk_content_hash,
             )
             self.session.add(record)
 
         self.session.commit()
+        if vectors is not None:
+            self._put_vectors([(owner_id, embedding_model, memory_id, vectors)])
         self.session.refresh(record)
         return record
 
-    def delete(self, memory_id: uuid.UUID) -> None:
-        record = self.session.get(MemoryEmbedding, memory_id)
-        if not record:
-            return
-        self.session.delete(record)
+    def _put_vectors(
+        self, items: Sequence[tuple[uuid.UUID, str, uuid.UUID, np.ndarray]]
+    ) -> None:
+        """Write committed rows' vectors to the ``vector_store``.
+
+        Runs after the commit so a rolled back transaction leaves no vectors
+        behind. If the write fails, the rows' ``content_hash`` is cleared so
+        the next reindex embeds those memories again.
+        """
+
+        assert self.vector_store is not None
+        grouped: defaultdict[tuple[uuid.UUID, str], list[tuple[uuid.UUID, np.ndarray]]] = (
+            defaultdict(list)
+        )
+        for owner_id, model, memory_id, vectors in items:
+            grouped[(owner_id, model)].append((memory_id, vectors))
+        try:
+            for (owner_id, model), group in grouped.items():
+                self.vector_store.put_many(
+                    owner_id,
+                    [memory_id for memory_id, _ in group],
+                    [vectors for _, vectors in group],
+                    model=model,
+                )
+        except Exception:
+            self.session.execute(
+                update(MemoryEmbedding)
+                .where(MemoryEmbedding.memory_id.in_({item[2] for item in items}))
+                .values(content_hash=None)
+            )
+            self.session.commit()
+            raise
+
+    def bulk_upsert(self, records: Sequence[dict[str, Any]]) -> datetime | None:
+        """Insert or update many embeddings with one statement and one commit.
+
+        Each record carries the same fields as ``upsert`` keyword arguments
+        plus ``memory_id`` and ``owner_id``. SQLite and PostgreSQL use a native
+        ``INSERT ... ON CONFLICT DO UPDATE``; other dialects fall back to
+        ``merge``. Returns the ``updated_at`` stamp shared by every row.
+        """
+
+        if not records:
+            return None
+        now = datetime.utcnow()
+
+        rows = [
+            {
+                "memory_id": record["memory_id"],
+                "owner_id": record["owner_id"],
+                "embedding": record["embedding_bytes"],
+                "embedding_dim": record["embedding_dim"],
+                "embedding_dtype": record["embedding_dtype"],
+                "embedding_model": record["embedding_model"],
+                "content_hash": record.get("content_hash"),
+                "tags": record.get("tags"),
+                "captured_at": record.get("captured_at"),
+                "source_device": record.get("source_device"),
+                "chunk_spans": record.get("chunk_spans"),
+                "chunk_content_hash": record.get("chunk_content_hash"),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for record in records
+        ]
+
+        pending_vectors: list[tuple[uuid.UUID, str, uuid.UUID, np.ndarray]] = []
+        if self.vector_store is not None:
+            for row in rows:
+                pending_vectors.append(
+                    (
+                        row["owner_id"],
+                        row["embedding_model"],
+                        row["memory_id"],
+                        np.frombuffer(
+                            row["embedding"], dtype=np.dtype(row["embedding_dtype"])
+                        ).reshape(-1, row["embedding_dim"]),
+                    )
+                )
+                row["embedding"] = b""
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(MemoryEmbedding)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[MemoryEmbedding.memory_id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in (
+                        "owner_id",
+                        "embedding",
+                        "embedding_dim",
+                        "embedding_dtype",
+                        "embedding_model",
+                        "content_hash",
+                        "tags",
+                        "captured_at",
+                        "source_device",
+                        "chunk_spans",
+                        "chunk_content_hash",
+                        "updated_at",
+                    )
+                },
+            )
+            self.session.execute(stmt, rows)
+        else:
+            for row in rows:
+                existing = self.session.get(MemoryEmbedding, row["memory_id"])
+                if existing is not None:
+                    row["created_at"] = existing.created_at
+                self.session.merge(MemoryEmbedding(**row))
         self.session.commit()
+        if pending_vectors:
+            self._put_vectors(pending_vectors)
+        # Read the stamp back so it compares equal to what fingerprints see.
+        return self.session.scalar(
+            select(MemoryEmbedding.updated_at).where(
+                MemoryEmbedding.memory_id == rows[0]["memory_id"]
+            )
+        )
+
+    def delete(self, memory_id: uuid.UUID, owner_id: uuid.UUID | None = None) -> None:
+        record = self.session.get(MemoryEmbedding, memory_id)
+        if record:
+            owner_id = record.owner_id
+            self.session.delete(record)
+            self.session.commit()
+        # Vectors go after the commit; loads skip ids without a committed row.
+        if self.vector_store is not None and owner_id is not None:
+            self.vector_store.delete(owner_id, memory_id)
 
     def get(self, memory_id: uuid.UUID) -> MemoryEmbedding | None:
         return self.session.get(MemoryEmbedding, memory_id)
 
-    def list_by_owner(self, owner_id: uuid.UUID) -> list[MemoryEmbedding]:
+    def get_many(self, memory_ids: Sequence[uuid.UUID]) -> list[MemoryEmbedding]:
+        if not memory_ids:
+            return []
+        stmt = select(MemoryEmbedding).where(MemoryEmbedding.memory_id.in_(set(memory_ids)))
+        return list(self.session.scalars(stmt).all())
+
+    def sample(self, *, model: str, limit: int) -> list[MemoryEmbedding]:
+        """Return up to ``limit`` records of one model, e.g. to fit a projection."""
+
+        stmt = (
+            select(MemoryEmbedding)
+            .where(MemoryEmbedding.embedding_model == model)
+            .order_by(MemoryEmbedding.memory_id)
+            .limit(limit)
+        )
+        return list(self.session.scalars(stmt).all())
+
+    def vectors(self, records: Sequence[MemoryEmbedding]) -> dict[uuid.UUID, np.ndarray]:
+        """Decode each record's payload into a float32 (chunks x dim) matrix.
+
+        Payloads held by the ``vector_store`` are read per owner and model.
+        Records whose payload is missing or malformed are left out.
+        """
+
+        decoded: dict[uuid.UUID, np.ndarray] = {}
+        if self.vector_store is None:
+            for record in records:
+                if not record.embedding or not record.embedding_dim:
+                    continue
+                values = np.frombuffer(record.embedding, dtype=np.dtype(record.embedding_dtype))
+                if values.size % record.embedding_dim:
+                    continue
+                decoded[record.memory_id] = values.reshape(-1, record.embedding_dim).astype(
+                    np.float32
+                )
+            return decoded
+
+        wanted: dict[tuple[uuid.UUID, str], set[uuid.UUID]] = defaultdict(set)
+        for record in records:
+            wanted[(record.owner_id, record.embedding_model)].add(record.memory_id)
+        for (owner_id, model), memory_ids in wanted.items():
+            ids, matrix, _ = self.vector_store.load(owner_id, model=model)
+            rows: dict[uuid.UUID, list[int]] = defaultdict(list)
+            for row, memory_id in enumerate(ids):
+                if memory_id in memory_ids:
+                    rows[memory_id].append(row)
+            for memory_id, memory_rows in rows.items():
+                decoded[memory_id] = matrix[memory_rows]
+        return decoded
+
+    def index_states(self, memory_ids: list[uuid.UUID]) -> dict[uuid.UUID, tuple]:
+        """Return (content_hash, tags, captured_at, source_device, embedding_dtype,
+        chunk_content_hash) per embedded memory."""
+
+        if not memory_ids:
+            return {}
+        stmt = select(
+            MemoryEmbedding.memory_id,
+            MemoryEmbedding.content_hash,
+            MemoryEmbedding.tags,
+            MemoryEmbedding.captured_at,
+            MemoryEmbedding.source_device,
+            MemoryEmbedding.embedding_dtype,
+            MemoryEmbedding.chunk_content_hash,
+        ).where(MemoryEmbedding.memory_id.in_(set(memory_ids)))
+        return {row[0]: tuple(row[1:]) for row in self.session.execute(stmt)}
+
+    def chunk_spans(
+        self, memory_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, tuple[list[list[int]], str | None]]:
+        """Return (spans, hash of the content they index) of chunked memories."""
+
+        if not memory_ids:
+            return {}
+        stmt = select(
+            MemoryEmbedding.memory_id,
+            MemoryEmbedding.chunk_spans,
+            MemoryEmbedding.chunk_content_hash,
+        ).where(MemoryEmbedding.memory_id.in_(set(memory_ids)))
+        return {
+            memory_id: (spans, digest)
+            for memory_id, spans, digest in self.session.execute(stmt)
+            if spans
+        }
+
+    def filter_rows(self, owner_id: uuid.UUID, *, model: str) -> list[tuple]:
+        """Return (memory_id, tags, captured_at, source_device) without vector payloads."""
+
+        stmt = select(
+            MemoryEmbedding.memory_id,
+            MemoryEmbedding.tags,
+            MemoryEmbedding.captured_at,
+            MemoryEmbedding.source_device,
+        ).where(
+            MemoryEmbedding.owner_id == owner_id,
+            MemoryEmbedding.embedding_model == model,
+        )
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def list_by_owner(
+        self, owner_id: uuid.UUID, *, model: str | None = None
+    ) -> list[MemoryEmbedding]:
         stmt = select(MemoryEmbedding).where(MemoryEmbedding.owner_id == owner_id)
+        if model is not None:
+            stmt = stmt.where(MemoryEmbedding.embedding_model == model)
         return list(self.session.scalars(stmt).all())
 
+    def count_by_model(self) -> dict[str, int]:
+        """Return the number of stored embeddings per model id."""
+
+        stmt = select(
+            MemoryEmbedding.embedding_model, func.count(MemoryEmbedding.memory_id)
+        ).group_by(MemoryEmbedding.embedding_model)
+        return {model: int(count) for model, count in self.session.execute(stmt)}
+
+    def owner_fingerprint(
+        self, owner_id: uuid.UUID, *, model: str
+    ) -> tuple[int, datetime | None]:
+        """Return the row count and latest update time for an owner's vectors."""
+
+        stmt = select(
+            func.count(MemoryEmbedding.memory_id),
+            func.max(MemoryEmbedding.updated_at),
+        ).where(
+            MemoryEmbedding.owner_id == owner_id,
+            MemoryEmbedding.embedding_model == model,
+        )
+        count, latest = self.session.execute(stmt).one()
+        return int(count), latest
+
@@ -1,8 +1,10 @@
 """Repository for memory entities."""
 
 import uuid
+from datetime import datetime
+from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
 
 from app.models import Memory
@@ -23,6 +25,15 @@ class MemoryRepository:
     def get(self, memory_id: uuid.UUID) -> Memory | None:
         return self.session.get(Memory, memory_id)
 
+    def get_many(self, memory_ids: Sequence[uuid.UUID]) -> list[Memory]:
+        """Load memories with a single IN query, preserving the given order."""
+
+        if not memory_ids:
+            return []
+        stmt = select(Memory).where(Memory.id.in_(set(memory_ids)))
+        found = {memory.id: memory for memory in self.session.scalars(stmt).all()}
+        return [found[memory_id] for memory_id in memory_ids if memory_id in found]
+
     def list_by_owner(self, owner_id: uuid.UUID) -> list[Memory]:
         stmt = (
             select(Memory)
@@ -31,10 +42,37 @@ class MemoryRepository:
         )
         return list(self.session.scalars(stmt).all())
 
+    def list_texts_by_owner(self, owner_id: uuid.UUID) -> list[Row]:
+        """Column-only (id, title, content, tags, context) rows, without ORM objects."""
+
+        stmt = select(
+            Memory.id, Memory.title, Memory.content, Memory.tags, Memory.context
+        ).where(Memory.owner_id == owner_id)
+        return list(self.session.execute(stmt).all())
+
     def list_all(self) -> list[Memory]:
         stmt = select(Memory).order_by(Memory.created_at.desc())
         return list(self.session.scalars(stmt).all())
 
+    def list_ids_after(
+        self,
+        after: uuid.UUID | None,
+        *,
+        limit: int,
+        owner_id: uuid.UUID | None = None,
+        since: datetime | None = None,
+    ) -> list[uuid.UUID]:
+        """Return the next page of memory ids in id order (keyset pagination)."""
+
+        stmt = select(Memory.id).order_by(Memory.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(Memory.id > after)
+        if owner_id is not None:
+            stmt = stmt.where(Memory.owner_id == owner_id)
+        if since is not None:
+            stmt = stmt.where(Memory.updated_at >= since)
+        return list(self.session.scalars(stmt).all())
+
     def update(self, memory: Memory) -> Memory:
         self.session.add(memory)
         self.session.commit()
@@ -0,0 +1,272 @@
+"""Pluggable storage backends for raw embedding vectors."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Protocol, Sequence
+
+import numpy as np
+
+from app.config import get_settings
+
+try:  # POSIX advisory locks coordinate writers across worker processes.
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+# ``compact`` skips files with fewer dead records than this (or than live ones).
+_COMPACT_MIN_DEAD_RECORDS = 1024
+
+
+class VectorStore(Protocol):
+    """Protocol for out-of-database vector storage."""
+
+    def put(
+        self,
+        owner_id: uuid.UUID,
+        memory_id: uuid.UUID,
+        vectors: np.ndarray,
+        *,
+        model: str,
+    ) -> None:
+        """Persist (or replace) a memory's vectors, one row per chunk."""
+
+    def put_many(
+        self,
+        owner_id: uuid.UUID,
+        memory_ids: list[uuid.UUID],
+        vectors: Sequence[np.ndarray],
+        *,
+        model: str,
+    ) -> None:
+        """Persist (or replace) the chunk vectors of several memories."""
+
+    def delete(self, owner_id: uuid.UUID, memory_id: uuid.UUID) -> None:
+        """Remove a memory's vector for every model."""
+
+    def load(
+        self, owner_id: uuid.UUID, *, model: str
+    ) -> tuple[list[uuid.UUID], np.ndarray, np.ndarray]:
+        """Return (memory id per row, row matrix, chunk index per row).
+
+        The matrix may be a read-only view of the stored data.
+        """
+
+    def owners(self) -> list[uuid.UUID]:
+        """Return the owners that have stored vectors."""
+
+    def compact(self, owner_id: uuid.UUID, *, force: bool = False) -> int:
+        """Drop dead records of an owner's vectors; returns the records removed."""
+
+
+class MmapVectorStore:
+    """Append-only float32 vector files per owner, read with ``np.memmap``.
+
+    Each (owner, model) pair maps to files ``{model}-{dim}-{generation}.vec``
+    of fixed-size records holding the memory id, a ``live`` field and the
+    vector; the highest generation is the active one, and writing another
+    dimension starts a new generation. A write appends one
+    record per chunk with ``live`` set to the chunk index plus one, and a
+    delete appends a tombstone with ``live`` 0. On load the latest record
+    per id wins; its ``live`` value tells how many records of that write
+    precede it. ``compact`` rewrites files in which dead records dominate;
+    it runs from ``python -m app.cli compact-vectors``, never on a query.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _record_dtype(dim: int) -> np.dtype:
+        return np.dtype(
+            [("memory_id", "V16"), ("live", "<i4"), ("vector", "<f4", (dim,))]
+        )
+
+    @staticmethod
+    def _model_slug(model: str) -> str:
+        return hashlib.sha1(model.encode("utf-8")).hexdigest()[:16]
+
+    def _owner_dir(self, owner_id: uuid.UUID) -> Path:
+        return self.root / str(owner_id)
+
+    def _files(self, owner_id: uuid.UUID, model: str | None = None) -> list[Path]:
+        owner_dir = self._owner_dir(owner_id)
+        if not owner_dir.exists():
+            return []
+        pattern = f"{self._model_slug(model)}-*.vec" if model else "*.vec"
+        # Files from before generations were numbered count as generation 0.
+        return sorted(
+            owner_dir.glob(pattern),
+            key=lambda path: (self._generation_of(path), path.stat().st_mtime),
+        )
+
+    @staticmethod
+    def _dim_of(path: Path) -> int:
+        return int(path.stem.split("-")[1])
+
+    @staticmethod
+    def _generation_of(path: Path) -> int:
+        parts = path.stem.split("-")
+        return int(parts[2]) if len(parts) > 2 else 0
+
+    @contextmanager
+    def _locked(self, owner_id: uuid.UUID) -> Iterator[None]:
+        owner_dir = self._owner_dir(owner_id)
+        owner_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, (owner_dir / ".lock").open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _append(
+        self,
+        path: Path,
+        memory_ids: list[uuid.UUID],
+        vectors: Sequence[np.ndarray] | None,
+    ) -> None:
+        """Append each memory's chunk records, or tombstones without vectors."""
+
+        counts = [1] * len(memory_ids) if vectors is None else [len(v) for v in vectors]
+        records = np.zeros(sum(counts), dtype=self._record_dtype(self._dim_of(path)))
+        records["memory_id"] = [
+            memory_id.bytes
+            for memory_id, count in zip(memory_ids, counts)
+            for _ in range(count)
+        ]
+        if vectors is not None:
+            records["live"] = np.concatenate([np.arange(1, count + 1) for count in counts])
+            records["vector"] = np.concatenate(vectors)
+        with path.open("ab") as handle:
+            handle.write(records.tobytes())
+
+    def put(
+        self,
+        owner_id: uuid.UUID,
+        memory_id: uuid.UUID,
+        vectors: np.ndarray,
+        *,
+        model: str,
+    ) -> None:
+        self.put_many(owner_id, [memory_id], [vectors], model=model)
+
+    def put_many(
+        self,
+        owner_id: uuid.UUID,
+        memory_ids: list[uuid.UUID],
+        vectors: Sequence[np.ndarray],
+        *,
+        model: str,
+    ) -> None:
+        if not memory_ids:
+            return
+        vectors = [
+            np.asarray(chunks, dtype=np.float32).reshape(-1, np.shape(chunks)[-1])
+            for chunks in vectors
+        ]
+        with self._locked(owner_id):
+            dim = vectors[0].shape[1]
+            files = self._files(owner_id, model)
+            if files and self._dim_of(files[-1]) == dim:
+                path = files[-1]
+            else:
+                generation = self._generation_of(files[-1]) + 1 if files else 1
+                path = (
+                    self._owner_dir(owner_id)
+                    / f"{self._model_slug(model)}-{dim}-{generation}.vec"
+                )
+            for other in files:
+                if other != path:
+                    self._append(other, memory_ids, None)
+            self._append(path, memory_ids, vectors)
+
+    def delete(self, owner_id: uuid.UUID, memory_id: uuid.UUID) -> None:
+        if not self._owner_dir(owner_id).exists():
+            return
+        with self._locked(owner_id):
+            for path in self._files(owner_id):
+                self._append(path, [memory_id], None)
+
+    def _replay(self, path: Path) -> tuple[np.ndarray, np.ndarray]:
+        """Map a file and return (records, indices of the live chunk records)."""
+
+        dtype = self._record_dtype(self._dim_of(path))
+        count = path.stat().st_size // dtype.itemsize  # ignore a torn tail
+        if count == 0:
+            return np.zeros(0, dtype=dtype), np.zeros(0, dtype=np.int64)
+        records = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+        _, reversed_first = np.unique(records["memory_id"][::-1], return_index=True)
+        latest = np.sort(count - 1 - reversed_first)
+        chunks = records["live"][latest].astype(np.int64)
+        latest, chunks = latest[chunks > 0], chunks[chunks > 0]
+        # Expand each latest record back to the first chunk of its write.
+        offsets = np.arange(chunks.sum()) - np.repeat(np.cumsum(chunks) - chunks, chunks)
+        return records, np.repeat(latest - chunks + 1, chunks) + offsets
+
+    def _compact(self, owner_id: uuid.UUID, path: Path, *, force: bool) -> int:
+        with self._locked(owner_id):
+            records, live = self._replay(path)
+            dead = records.shape[0] - live.size
+            if not dead or (not force and dead <= max(live.size, _COMPACT_MIN_DEAD_RECORDS)):
+                return 0
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open("wb") as handle:
+                handle.write(np.ascontiguousarray(records[live]).tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            del records
+            os.replace(tmp_path, path)
+            return dead
+
+    def owners(self) -> list[uuid.UUID]:
+        if not self.root.exists():
+            return []
+        return [uuid.UUID(path.name) for path in sorted(self.root.iterdir()) if path.is_dir()]
+
+    def compact(self, owner_id: uuid.UUID, *, force: bool = False) -> int:
+        """Rewrite an owner's vector files without dead records.
+
+        Without ``force`` only files whose dead records outnumber the live
+        ones (and at least ``_COMPACT_MIN_DEAD_RECORDS``) are rewritten.
+        """
+
+        return sum(
+            self._compact(owner_id, path, force=force) for path in self._files(owner_id)
+        )
+
+    def load(
+        self, owner_id: uuid.UUID, *, model: str
+    ) -> tuple[list[uuid.UUID], np.ndarray, np.ndarray]:
+        files = self._files(owner_id, model)
+        if not files:
+            return [], np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int32)
+
+        records, live = self._replay(files[-1])
+        if live.size and live[-1] - live[0] + 1 == live.size:
+            # Live records are contiguous (always so after ``compact``):
+            # slice the map instead of copying the vectors out of it.
+            live = slice(int(live[0]), int(live[-1]) + 1)
+        ids = [uuid.UUID(bytes=bytes(key)) for key in records["memory_id"][live]]
+        matrix = records["vector"][live]
+        chunks = records["live"][live].astype(np.int32) - 1
+        return ids, matrix, chunks
+
+
+@lru_cache()
+def get_vector_store() -> VectorStore | None:
+    """Return the configured out-of-database vector store, if any."""
+
+    settings = get_settings()
+    if settings.rag_vector_store == "mmap":
+        return MmapVectorStore(settings.storage_dir / "vectors")
+    return None
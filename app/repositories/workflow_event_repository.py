@@ -0,0 +1,108 @@
+"""Repository for the workflow event outbox."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import WorkflowEvent
+
+
+class WorkflowEventRepository:
+    """Stages, claims and settles outbox events."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, event: str, payload: dict[str, Any]) -> WorkflowEvent:
+        """Stage an event in the current transaction; the caller commits."""
+
+        record = WorkflowEvent(event=event, payload=payload)
+        self.session.add(record)
+        return record
+
+    def claim(
+        self,
+        *,
+        limit: int,
+        lease_seconds: float,
+        max_attempts: int,
+    ) -> list[WorkflowEvent]:
+        """Lease up to ``limit`` due events to the caller.
+
+        Candidates are locked with ``FOR UPDATE SKIP LOCKED`` where the
+        dialect supports it; the conditional update with a unique claim token
+        keeps concurrent claimers from taking the same rows elsewhere.
+        """
+
+        now = datetime.utcnow()
+        claimable = (
+            WorkflowEvent.available_at <= now,
+            WorkflowEvent.attempts < max_attempts,
+            or_(WorkflowEvent.claimed_until.is_(None), WorkflowEvent.claimed_until < now),
+        )
+        stmt = (
+            select(WorkflowEvent.id)
+            .where(*claimable)
+            .order_by(WorkflowEvent.id)
+            .limit(limit)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+        ids = list(self.session.scalars(stmt).all())
+        if not ids:
+            self.session.rollback()
+            return []
+
+        token = uuid.uuid4().hex
+        self.session.execute(
+            update(WorkflowEvent)
+            .where(WorkflowEvent.id.in_(ids), *claimable)
+            .values(
+                claim_token=token,
+                claimed_until=now + timedelta(seconds=lease_seconds),
+            )
+        )
+        self.session.commit()
+        stmt = (
+            select(WorkflowEvent)
+            .where(WorkflowEvent.claim_token == token)
+            .order_by(WorkflowEvent.id)
+        )
+        return list(self.session.scalars(stmt).all())
+
+    def complete(self, event_ids: Sequence[int]) -> None:
+        if not event_ids:
+            return
+        self.session.execute(
+            delete(WorkflowEvent).where(WorkflowEvent.id.in_(set(event_ids)))
+        )
+        self.session.commit()
+
+    def release(
+        self,
+        event_ids: Sequence[int],
+        *,
+        delay_seconds: float,
+        error: str | None = None,
+    ) -> None:
+        """Return failed events to the outbox after a backoff delay."""
+
+        if not event_ids:
+            return
+        self.session.execute(
+            update(WorkflowEvent)
+            .where(WorkflowEvent.id.in_(set(event_ids)))
+            .values(
+                attempts=WorkflowEvent.attempts + 1,
+                available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+                claim_token=None,
+                claimed_until=None,
+                last_error=(error or "")[:500] or None,
+            )
+        )
+        self.session.commit()
@@ -5,6 +5,10 @@ from app.schemas.assistant import (
     AssistantChatRequest,
     AssistantChatResponse,
     AssistantContextMemory,
+    AssistantTokenUsage,
+    CompletionCacheStats,
+    MemorySearchFilters,
+    QueryCacheStats,
 )
 from app.schemas.memory import (
     MemoryCreate,
@@ -18,6 +22,10 @@ __all__ = [
     "AssistantChatRequest",
     "AssistantChatResponse",
     "AssistantContextMemory",
+    "AssistantTokenUsage",
+    "CompletionCacheStats",
+    "MemorySearchFilters",
+    "QueryCacheStats",
     "UserCreate",
     "UserRead",
     "MemoryCreate",
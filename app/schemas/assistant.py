@@ -1,11 +1,21 @@
 """Assistant chat schemas."""
 
 import uuid
+from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
 
 
+class MemorySearchFilters(BaseModel):
+    """Restricts RAG retrieval; all given filters must match."""
+
+    tags: list[str] | None = Field(default=None, description="Match any of these tags")
+    captured_from: datetime | None = None
+    captured_to: datetime | None = None
+    source_device: str | None = None
+
+
 class AssistantChatRequest(BaseModel):
     message: str = Field(min_length=1)
     owner_id: uuid.UUID | None = None
@@ -13,6 +23,8 @@ class AssistantChatRequest(BaseModel):
     history: list[dict[str, Any]] | None = None
     top_k: int | None = Field(default=None, ge=1, le=20)
     use_rag: bool = True
+    filters: MemorySearchFilters | None = None
+    debug: bool = Field(default=False, description="Return per-stage timings")
 
 
 class AssistantContextMemory(BaseModel):
@@ -20,9 +32,60 @@ class AssistantContextMemory(BaseModel):
     title: str
     snippet: str
     score: float | None = None
+    fused_score: float | None = Field(
+        default=None, description="Hybrid retrieval's reciprocal-rank fusion score"
+    )
+
+
+class AssistantTokenUsage(BaseModel):
+    """Prompt token accounting for one reply.
+
+    ``prompt_tokens`` is the local count unless the model reported usage;
+    ``trimmed_memories`` were cut to their most relevant sentences and
+    ``dropped_*`` items did not fit the budget at all.
+    """
+
+    tokenizer: str
+    budget_tokens: int
+    prompt_tokens: int
+    memory_tokens: int
+    history_tokens: int
+    completion_tokens: int | None = None
+    total_tokens: int | None = None
+    trimmed_memories: int = 0
+    dropped_memories: int = 0
+    dropped_history: int = 0
 
 
 class AssistantChatResponse(BaseModel):
     reply: str
     used_memory_ids: list[uuid.UUID] = Field(default_factory=list)
     context: list[AssistantContextMemory] = Field(default_factory=list)
+    usage: AssistantTokenUsage | None = None
+    cached: bool = Field(default=False, description="Reply served from the completion cache")
+    timings: dict[str, float] | None = Field(
+        default=None, description="Milliseconds per stage, when the request sets debug"
+    )
+
+
+class CompletionCacheStats(BaseModel):
+    """Counters of the process-wide assistant completion cache."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    invalidated: int
+    stale: int
+    entries: int
+    hit_rate: float
+
+
+class QueryCacheStats(BaseModel):
+    """Counters of the process-wide query embedding cache."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    expired: int
+    entries: int
+    hit_rate: float
@@ -0,0 +1,67 @@
+"""Inverted-file (IVF) helpers for approximate nearest neighbour search.
+
+Vectors are assumed to be unit-normalized, so clustering uses spherical
+k-means and assignment picks the centroid with the highest dot product.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_ASSIGN_BATCH_ROWS = 8192
+
+
+def default_nlist(size: int) -> int:
+    """Heuristic number of inverted lists for ``size`` vectors."""
+
+    return max(1, int(np.sqrt(size)))
+
+
+def train_centroids(
+    matrix: np.ndarray,
+    nlist: int,
+    *,
+    iterations: int = 10,
+    sample_per_list: int = 64,
+    seed: int = 0,
+) -> np.ndarray:
+    """Fit ``nlist`` unit-norm centroids with spherical k-means."""
+
+    rng = np.random.default_rng(seed)
+    rows = matrix.shape[0]
+    nlist = max(1, min(nlist, rows))
+    sample_size = min(rows, nlist * sample_per_list)
+    sample = matrix[rng.choice(rows, size=sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms > 0, norms, 1.0)
+    return centroids.astype(np.float32)
+
+
+def assign_lists(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the nearest centroid index for every row of ``matrix``."""
+
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], _ASSIGN_BATCH_ROWS):
+        block = matrix[start : start + _ASSIGN_BATCH_ROWS]
+        labels[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def probe_lists(query: np.ndarray, centroids: np.ndarray, nprobe: int) -> np.ndarray:
+    """Return the ``nprobe`` list indices closest to a unit query."""
+
+    scores = centroids @ query
+    nprobe = min(nprobe, scores.size)
+    if nprobe >= scores.size:
+        return np.arange(scores.size)
+    return np.argpartition(scores, -nprobe)[-nprobe:]
@@ -2,21 +2,110 @@
 
 from __future__ import annotations
 
-import textwrap
+import asyncio
+import json
+import logging
+import re
+import time
 import uuid
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple, TypeVar
 
+import numpy as np
 from openai import OpenAI
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
+from app.models import Memory
 from app.repositories import MemoryRepository
 from app.schemas import (
     AssistantChatRequest,
     AssistantChatResponse,
     AssistantContextMemory,
+    AssistantTokenUsage,
 )
+from app.services.completion_cache import (
+    completion_key,
+    get_completion_cache,
+    memory_versions,
+)
+from app.services.context_budget import (
+    BudgetedContext,
+    ContextBudgeter,
+    MemoryEntry,
+    get_token_counter,
+)
+from app.services.openai_clients import get_async_openai_client, get_openai_client
 from app.services.rag_service import RAGService
+from app.services.vector_cache import OwnerVectors
+
+logger = logging.getLogger(__name__)
+
+_FALLBACK_WORDS_PER_CHUNK = 4
+_TEMPERATURE = 0.7
+
+T = TypeVar("T")
+Prefetched = Tuple[Dict[uuid.UUID, Memory], OwnerVectors | None]
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@lru_cache()
+def _query_embedding_pool() -> ThreadPoolExecutor:
+    """Threads embedding queries while the request thread reads the database.
+
+    Each streaming chat holds one server threadpool thread and one of these,
+    so the default size matches the server's threadpool (40 with anyio).
+    """
+
+    return ThreadPoolExecutor(
+        max_workers=get_settings().assistant_query_embed_threads,
+        thread_name_prefix="assistant-embed",
+    )
+
+
+class StageTimings:
+    """Wall-clock milliseconds per chat stage, reported in debug mode.
+
+    Stages that run concurrently overlap, so their sum can exceed the wall
+    time; ``gather`` covers the whole concurrent part and ``total`` the call.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def _record(self, name: str, started: float) -> None:
+        self.stages[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, started)
+
+    def timed(self, name: str, func: Callable[..., T]) -> Callable[..., T]:
+        def run(*args: Any) -> T:
+            with self.stage(name):
+                return func(*args)
+
+        return run
+
+    async def atimed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.stage(name):
+            return await awaitable
+
+    def report(self) -> dict[str, float]:
+        self._record("total", self.started)
+        return dict(self.stages)
 
 
 class AssistantService:
@@ -27,14 +116,11 @@ class AssistantService:
         self.memory_repo = MemoryRepository(session)
         self.rag_service = RAGService(session)
         self.settings = get_settings()
-        self._client: OpenAI | None = None
 
     def _client_instance(self) -> OpenAI:
         if not self.settings.openai_api_key:
             raise RuntimeError("OpenAI API key is not configured")
-        if self._client is None:
-            self._client = OpenAI(api_key=self.settings.openai_api_key)
-        return self._client
+        return get_openai_client()
 
     @staticmethod
     def _unique_ids(memory_ids: List[uuid.UUID]) -> List[uuid.UUID]:
@@ -46,11 +132,73 @@ class AssistantService:
                 ordered.append(memory_id)
         return ordered
 
+    def _wants_rag(self, payload: AssistantChatRequest) -> bool:
+        return bool(payload.use_rag and payload.owner_id and self.settings.rag_enabled)
+
+    def _prefetch(self, payload: AssistantChatRequest, timings: StageTimings) -> Prefetched:
+        """Database half of retrieval: explicit memories and the owner's vectors."""
+
+        with timings.stage("load_memories"):
+            explicit = {
+                memory.id: memory
+                for memory in self.memory_repo.get_many(payload.memory_ids or [])
+            }
+        vectors = None
+        if self._wants_rag(payload):
+            with timings.stage("load_vectors"):
+                vectors = self.rag_service.owner_vectors(payload.owner_id)
+        return explicit, vectors
+
+    def _gather(
+        self, payload: AssistantChatRequest, timings: StageTimings
+    ) -> tuple[Prefetched, np.ndarray | None]:
+        """Embed the query in a worker thread while this thread queries the database.
+
+        The session stays on the calling thread; the embedding touches none.
+        """
+
+        with timings.stage("gather"):
+            embedding = None
+            if self._wants_rag(payload):
+                embedding = _query_embedding_pool().submit(
+                    timings.timed("embed_query", self.rag_service.embed_query),
+                    payload.message,
+                )
+            prefetched = self._prefetch(payload, timings)
+            query_vector = embedding.result() if embedding is not None else None
+        return prefetched, query_vector
+
+    async def _agather(
+        self, payload: AssistantChatRequest, timings: StageTimings
+    ) -> tuple[Prefetched, np.ndarray | None]:
+        """Async ``_gather``: the embedding is awaited on the event loop."""
+
+        with timings.stage("gather"):
+            steps: list[Awaitable[Any]] = [asyncio.to_thread(self._prefetch, payload, timings)]
+            if self._wants_rag(payload):
+                steps.append(
+                    timings.atimed("embed_query", self.rag_service.aembed_query(payload.message))
+                )
+            results = await asyncio.gather(*steps)
+        return results[0], results[1] if len(results) > 1 else None
+
     def _resolve_memory_ids(
-        self, payload: AssistantChatRequest
-    ) -> Tuple[List[uuid.UUID], Dict[uuid.UUID, float]]:
+        self,
+        payload: AssistantChatRequest,
+        query_vector: np.ndarray | None = None,
+        vectors: OwnerVectors | None = None,
+    ) -> Tuple[
+        List[uuid.UUID],
+        Dict[uuid.UUID, float],
+        Dict[uuid.UUID, float],
+        Dict[uuid.UUID, Memory],
+        Dict[uuid.UUID, str],
+    ]:
         resolved_ids: List[uuid.UUID] = []
         rag_scores: Dict[uuid.UUID, float] = {}
+        fused_scores: Dict[uuid.UUID, float] = {}
+        loaded: Dict[uuid.UUID, Memory] = {}
+        chunks: Dict[uuid.UUID, str] = {}
 
         if payload.memory_ids:
             resolved_ids.extend(payload.memory_ids)
@@ -60,36 +208,54 @@ class AssistantService:
                 payload.message,
                 owner_id=payload.owner_id,
                 top_k=payload.top_k,
+                filters=payload.filters,
+                query_vector=query_vector,
+                vectors=vectors,
             )
             for result in rag_results:
                 rag_scores[result.memory.id] = result.score
+                if result.fused_score is not None:
+                    fused_scores[result.memory.id] = result.fused_score
+                loaded[result.memory.id] = result.memory
+                if result.chunk is not None:
+                    chunks[result.memory.id] = result.chunk
                 resolved_ids.append(result.memory.id)
 
-        return self._unique_ids(resolved_ids), rag_scores
+        return self._unique_ids(resolved_ids), rag_scores, fused_scores, loaded, chunks
 
     def _collect_memories(
         self,
         memory_ids: list[uuid.UUID],
         score_map: dict[uuid.UUID, float] | None = None,
-    ) -> tuple[list[Any], list[str]]:
+        preloaded: dict[uuid.UUID, Memory] | None = None,
+        chunks: dict[uuid.UUID, str] | None = None,
+    ) -> tuple[list[Memory], list[MemoryEntry]]:
+        loaded = dict(preloaded or {})
+        missing = [memory_id for memory_id in memory_ids if memory_id not in loaded]
+        for memory in self.memory_repo.get_many(missing):
+            loaded[memory.id] = memory
+
         records = []
-        snippets: list[str] = []
+        entries: list[MemoryEntry] = []
         for memory_id in memory_ids:
-            memory = self.memory_repo.get(memory_id)
+            memory = loaded.get(memory_id)
             if not memory:
                 continue
             records.append(memory)
-            snippet = textwrap.dedent(
-                f"""
-                제목: {memory.title}
-                내용: {memory.content}
-                태그: {', '.join(memory.tags) if memory.tags else '없음'}
-                """
-            ).strip()
-            if score_map and memory.id in score_map:
-                snippet += f"\n관련도 점수: {score_map[memory.id]:.3f}"
-            snippets.append(snippet)
-        return records, snippets
+            score = (score_map or {}).get(memory.id)
+            footer = f"\n태그: {', '.join(memory.tags) if memory.tags else '없음'}"
+            if score is not None:
+                footer += f"\n관련도 점수: {score:.3f}"
+            # Long memories contribute only the chunk that matched the query.
+            entries.append(
+                MemoryEntry(
+                    header=f"제목: {memory.title}\n내용: ",
+                    body=(chunks or {}).get(memory.id, memory.content).strip(),
+                    footer=footer,
+                    score=score,
+                )
+            )
+        return records, entries
 
     def _build_prompt(self, message: str, snippets: list[str]) -> list[dict[str, str]]:
         system_prompt = (
@@ -113,43 +279,246 @@ class AssistantService:
         prompt.append({"role": "user", "content": message})
         return prompt
 
-    def chat(self, payload: AssistantChatRequest) -> AssistantChatResponse:
-        memory_ids, rag_scores = self._resolve_memory_ids(payload)
-        memory_records, snippets = self._collect_memories(memory_ids, rag_scores)
+    def _budget(
+        self, payload: AssistantChatRequest, entries: list[MemoryEntry]
+    ) -> BudgetedContext:
+        counter = get_token_counter(self.settings.openai_model)
+        budgeter = ContextBudgeter(
+            counter,
+            max_tokens=self.settings.assistant_context_max_tokens,
+            history_ratio=self.settings.assistant_history_ratio,
+            min_memory_tokens=self.settings.assistant_memory_min_tokens,
+        )
+        history = [
+            {"role": entry["role"], "content": entry["content"]}
+            for entry in payload.history or []
+            if "role" in entry and "content" in entry
+        ]
+        # An empty snippet list still costs the memories system message.
+        base_prompt = self._build_prompt(payload.message, [""] if entries else [])
+        return budgeter.build(
+            query=payload.message,
+            base_tokens=counter.count_messages(base_prompt),
+            memories=entries,
+            history=history,
+        )
 
-        if self.settings.openai_api_key:
-            client = self._client_instance()
-            messages = self._build_prompt(payload.message, snippets)
-            if payload.history:
-                for entry in payload.history:
-                    if "role" in entry and "content" in entry:
-                        messages.append({"role": entry["role"], "content": entry["content"]})
-            completion = client.chat.completions.create(
-                model=self.settings.openai_model,
-                messages=messages,
-                temperature=0.7,
+    def _retrieve(
+        self,
+        payload: AssistantChatRequest,
+        timings: StageTimings,
+        gathered: tuple[Prefetched, np.ndarray | None] | None = None,
+    ) -> tuple[list[Memory], BudgetedContext, list[AssistantContextMemory]]:
+        (explicit, vectors), query_vector = gathered or self._gather(payload, timings)
+        with timings.stage("search"):
+            memory_ids, rag_scores, fused_scores, loaded, chunks = self._resolve_memory_ids(
+                payload, query_vector, vectors
             )
-            reply = completion.choices[0].message.content or ""
-        else:
-            reply = self._build_fallback_response(payload.message, snippets)
-
-        used_ids = [memory.id for memory in memory_records]
+        with timings.stage("build_context"):
+            candidates, entries = self._collect_memories(
+                memory_ids, rag_scores, {**explicit, **loaded}, chunks
+            )
+            budgeted = self._budget(payload, entries)
+        # Memories that did not fit the budget are not part of the prompt.
+        kept = [
+            (memory, snippet)
+            for memory, snippet in zip(candidates, budgeted.snippets)
+            if snippet is not None
+        ]
+        budgeted.snippets = [snippet for _, snippet in kept]
         context = [
             AssistantContextMemory(
                 memory_id=memory.id,
                 title=memory.title,
-                snippet=snippets[idx],
+                snippet=snippet,
                 score=rag_scores.get(memory.id),
+                fused_score=fused_scores.get(memory.id),
             )
-            for idx, memory in enumerate(memory_records)
+            for memory, snippet in kept
         ]
+        return [memory for memory, _ in kept], budgeted, context
+
+    def _messages(
+        self, payload: AssistantChatRequest, budgeted: BudgetedContext
+    ) -> list[dict[str, str]]:
+        messages = self._build_prompt(payload.message, budgeted.snippets)
+        messages.extend(budgeted.history)
+        return messages
+
+    def _usage(
+        self,
+        budgeted: BudgetedContext,
+        messages: list[dict[str, str]],
+        completion: Any = None,
+    ) -> AssistantTokenUsage:
+        usage = AssistantTokenUsage(
+            tokenizer=budgeted.tokenizer,
+            budget_tokens=budgeted.budget_tokens,
+            prompt_tokens=get_token_counter(self.settings.openai_model).count_messages(
+                messages
+            ),
+            memory_tokens=budgeted.memory_tokens,
+            history_tokens=budgeted.history_tokens,
+            trimmed_memories=budgeted.trimmed_memories,
+            dropped_memories=budgeted.dropped_memories,
+            dropped_history=budgeted.dropped_history,
+        )
+        reported = getattr(completion, "usage", None)
+        if reported is not None:
+            usage.prompt_tokens = reported.prompt_tokens
+            usage.completion_tokens = reported.completion_tokens
+            usage.total_tokens = reported.total_tokens
+        return usage
+
+    def _cache_key(self, messages: list[dict[str, str]]) -> str | None:
+        if not (self.settings.assistant_completion_cache_enabled and self.settings.openai_api_key):
+            return None
+        return completion_key(self.settings.openai_model, messages, _TEMPERATURE)
+
+    def _cached_response(
+        self,
+        cache_key: str | None,
+        memory_records: list[Memory],
+        budgeted: BudgetedContext,
+        context: list[AssistantContextMemory],
+        messages: list[dict[str, str]],
+        timings: StageTimings,
+        debug: bool,
+    ) -> AssistantChatResponse | None:
+        if not cache_key:
+            return None
+        with timings.stage("cache_lookup"):
+            reply = get_completion_cache().get(
+                cache_key, memory_versions({m.id: m.updated_at for m in memory_records})
+            )
+        if reply is None:
+            return None
+        return AssistantChatResponse(
+            reply=reply,
+            used_memory_ids=[memory.id for memory in memory_records],
+            context=context,
+            usage=self._usage(budgeted, messages),
+            cached=True,
+            timings=timings.report() if debug else None,
+        )
+
+    async def achat(self, payload: AssistantChatRequest) -> AssistantChatResponse:
+        """Answer ``payload`` for the ``async def`` chat route.
+
+        The query embedding and completion are awaited on the shared
+        ``AsyncOpenAI`` client; the database-bound retrieval and the
+        completion cache's SQLite reads and writes run in worker threads, so
+        neither waiting on OpenAI nor disk I/O blocks the event loop.
+        Explicit memories and the owner's vectors load while the query is
+        being embedded.
+        """
+
+        timings = StageTimings()
+        gathered = await self._agather(payload, timings)
+        memory_records, budgeted, context = await asyncio.to_thread(
+            self._retrieve, payload, timings, gathered
+        )
+        messages = self._messages(payload, budgeted)
+
+        completion = None
+        cache_key = self._cache_key(messages)
+        cached = await asyncio.to_thread(
+            self._cached_response,
+            cache_key,
+            memory_records,
+            budgeted,
+            context,
+            messages,
+            timings,
+            payload.debug,
+        )
+        if cached is not None:
+            return cached
+        if self.settings.openai_api_key:
+            with timings.stage("completion"):
+                completion = await get_async_openai_client().chat.completions.create(
+                    model=self.settings.openai_model,
+                    messages=messages,
+                    temperature=_TEMPERATURE,
+                )
+            reply = completion.choices[0].message.content or ""
+            if cache_key:
+                await asyncio.to_thread(
+                    get_completion_cache().put,
+                    cache_key,
+                    reply,
+                    memory_versions({m.id: m.updated_at for m in memory_records}),
+                )
+        else:
+            reply = self._build_fallback_response(payload.message, budgeted.snippets)
 
         return AssistantChatResponse(
             reply=reply,
-            used_memory_ids=used_ids,
+            used_memory_ids=[memory.id for memory in memory_records],
             context=context,
+            usage=self._usage(budgeted, messages, completion),
+            timings=timings.report() if payload.debug else None,
         )
 
+    def chat_stream(self, payload: AssistantChatRequest) -> Iterator[str]:
+        """Retrieve context now and return an iterator of SSE messages.
+
+        Retrieval runs before this returns, so the database session is not
+        needed while streaming. Events: ``context`` (used memory ids, snippets
+        and prompt token usage, plus retrieval ``timings`` in debug mode), then
+        ``delta`` with ``{"text": ...}`` per token chunk, and finally ``done``
+        with the full reply, or ``error`` if generation fails.
+        """
+
+        timings = StageTimings()
+        memory_records, budgeted, context = self._retrieve(payload, timings)
+        messages = self._messages(payload, budgeted)
+        head = {
+            "used_memory_ids": [str(memory.id) for memory in memory_records],
+            "context": [item.model_dump(mode="json") for item in context],
+            "usage": self._usage(budgeted, messages).model_dump(mode="json"),
+        }
+        if payload.debug:
+            head["timings"] = timings.report()
+        if self.settings.openai_api_key:
+            deltas = self._openai_deltas(messages)
+        else:
+            deltas = self._fallback_deltas(
+                self._build_fallback_response(payload.message, budgeted.snippets)
+            )
+        return self._stream_events(head, deltas)
+
+    @staticmethod
+    def _stream_events(head: dict[str, Any], deltas: Iterator[str]) -> Iterator[str]:
+        yield _sse("context", head)
+        parts: list[str] = []
+        try:
+            for text in deltas:
+                parts.append(text)
+                yield _sse("delta", {"text": text})
+        except Exception as exc:  # noqa: BLE001 - the status line is already sent
+            logger.exception("Assistant stream failed")
+            yield _sse("error", {"detail": str(exc)})
+            return
+        yield _sse("done", {"reply": "".join(parts)})
+
+    def _openai_deltas(self, messages: list[dict[str, str]]) -> Iterator[str]:
+        stream = self._client_instance().chat.completions.create(
+            model=self.settings.openai_model,
+            messages=messages,
+            temperature=_TEMPERATURE,
+            stream=True,
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @staticmethod
+    def _fallback_deltas(reply: str) -> Iterator[str]:
+        words = re.findall(r"\S+\s*|\s+", reply)
+        for start in range(0, len(words), _FALLBACK_WORDS_PER_CHUNK):
+            yield "".join(words[start : start + _FALLBACK_WORDS_PER_CHUNK])
+
     @staticmethod
     def _build_fallback_response(message: str, snippets: list[str]) -> str:
         if snippets:
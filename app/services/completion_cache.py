@@ -0,0 +1,238 @@
+"""Cache of assistant completions keyed by the exact prompt."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping
+
+from app.config import get_settings
+
+Versions = dict[str, str]
+
+
+def completion_key(model: str, messages: list[dict[str, Any]], temperature: float) -> str:
+    """Fingerprint of a chat completion request.
+
+    The messages embed the retrieved memory snippets, so any change to the
+    context that reaches the prompt yields a different key.
+    """
+
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def memory_versions(updated: Mapping[uuid.UUID, datetime | None]) -> Versions:
+    """Normalize ``{memory_id: updated_at}`` of the memories a prompt used."""
+
+    return {
+        str(memory_id): stamp.isoformat() if stamp is not None else ""
+        for memory_id, stamp in updated.items()
+    }
+
+
+class CompletionCache:
+    """LRU of completion replies with a TTL and an optional SQLite tier.
+
+    Each entry records the ``updated_at`` of every memory its prompt used,
+    and ``get`` serves it only while the caller's freshly loaded memories
+    still carry those versions. The database is shared by every worker, so
+    no process serves a reply built from a memory changed elsewhere, even
+    from a trimmed snippet whose text did not change. ``invalidate`` just
+    frees such entries early.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: Path | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str, Versions]] = OrderedDict()
+        self._by_memory: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._invalidated = 0
+        self._stale = 0
+        self._puts = 0
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(completion_memories)")}
+            if columns and "version" not in columns:
+                # Entries from before versions were recorded cannot be validated.
+                self._db.execute("DROP TABLE completion_memories")
+                self._db.execute("DELETE FROM completions")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, "
+                "reply TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completion_memories "
+                "(memory_id TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL, "
+                "PRIMARY KEY (memory_id, key))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_completion_memories_key "
+                "ON completion_memories (key)"
+            )
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        assert self._db is not None
+        self._db.execute(
+            "DELETE FROM completions WHERE created_at < ? OR key NOT IN "
+            "(SELECT key FROM completions ORDER BY created_at DESC LIMIT ?)",
+            (time.time() - self.ttl_seconds, self.max_entries),
+        )
+        self._db.execute(
+            "DELETE FROM completion_memories WHERE key NOT IN (SELECT key FROM completions)"
+        )
+        self._db.commit()
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for memory_id in entry[2]:
+            keys = self._by_memory.get(memory_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_memory[memory_id]
+
+    def _remember(self, key: str, created_at: float, reply: str, versions: Versions) -> None:
+        self._forget(key)
+        self._entries[key] = (created_at, reply, versions)
+        for memory_id in versions:
+            self._by_memory.setdefault(memory_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._forget(next(iter(self._entries)))
+
+    def _drop(self, keys: set[str]) -> None:
+        for key in keys:
+            self._forget(key)
+        if self._db is not None and keys:
+            params = [(key,) for key in keys]
+            self._db.executemany("DELETE FROM completions WHERE key = ?", params)
+            self._db.executemany("DELETE FROM completion_memories WHERE key = ?", params)
+            self._db.commit()
+
+    def get(self, key: str, versions: Versions) -> str | None:
+        """Return the reply for ``key`` if its memories still have ``versions``."""
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            from_disk = entry is None and self._db is not None
+            if from_disk:
+                row = self._db.execute(
+                    "SELECT reply, created_at FROM completions WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row is not None:
+                    stored = dict(
+                        self._db.execute(
+                            "SELECT memory_id, version FROM completion_memories WHERE key = ?",
+                            (key,),
+                        ).fetchall()
+                    )
+                    self._remember(key, row[1], row[0], stored)
+                    entry = self._entries[key]
+            if entry is not None:
+                if now - entry[0] > self.ttl_seconds:
+                    self._forget(key)
+                elif entry[2] != versions:
+                    self._drop({key})
+                    self._stale += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    self._disk_hits += int(from_disk)
+                    return entry[1]
+            self._misses += 1
+            return None
+
+    def put(self, key: str, reply: str, versions: Versions) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, reply, dict(versions))
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, reply, created_at) VALUES (?, ?, ?)",
+                (key, reply, now),
+            )
+            self._db.execute("DELETE FROM completion_memories WHERE key = ?", (key,))
+            self._db.executemany(
+                "INSERT INTO completion_memories (memory_id, key, version) VALUES (?, ?, ?)",
+                [(memory_id, key, version) for memory_id, version in versions.items()],
+            )
+            self._puts += 1
+            if self._puts % max(self.max_entries, 1) == 0:
+                self._prune_disk()
+            else:
+                self._db.commit()
+
+    def invalidate(self, memory_id: uuid.UUID) -> int:
+        """Drop every reply whose prompt used ``memory_id``; returns the count."""
+
+        memory_key = str(memory_id)
+        with self._lock:
+            keys = set(self._by_memory.get(memory_key, ()))
+            if self._db is not None:
+                keys.update(
+                    key
+                    for (key,) in self._db.execute(
+                        "SELECT key FROM completion_memories WHERE memory_id = ?",
+                        (memory_key,),
+                    )
+                )
+            self._drop(keys)
+            self._invalidated += len(keys)
+            return len(keys)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "invalidated": self._invalidated,
+                "stale": self._stale,
+                "entries": len(self._entries),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache()
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide completion cache."""
+
+    settings = get_settings()
+    path = (
+        settings.storage_dir / "completion_cache.sqlite3"
+        if settings.assistant_completion_cache_disk
+        else None
+    )
+    return CompletionCache(
+        settings.assistant_completion_cache_size,
+        settings.assistant_completion_cache_ttl_seconds,
+        path,
+    )
@@ -0,0 +1,301 @@
+"""Token-budgeted assembly of assistant prompt context."""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Sequence
+
+from app.services.keyword_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Chat format overhead per message and for priming the reply (OpenAI's recipe).
+_TOKENS_PER_MESSAGE = 3
+_REPLY_PRIMING_TOKENS = 3
+_ELLIPSIS = " … "
+_SENTENCE_PATTERN = re.compile(r"[^.!?。\n]+(?:[.!?。]+|\n+|$)")
+
+
+class TokenCounter:
+    """Counts tokens with ``tiktoken`` (a requirement), else estimates.
+
+    The estimate charges one token per four ASCII characters and one per
+    other character (Hangul syllables usually cost one or more), so it errs
+    towards overcounting and budgets stay within the real context window.
+    """
+
+    def __init__(self, model: str):
+        self._encoding = None
+        try:
+            import tiktoken
+        except ImportError:  # pragma: no cover - listed in requirements.txt
+            logger.warning(
+                "tiktoken is not installed; prompt budgets use a character-based "
+                "estimate instead of the %s tokenizer",
+                model,
+            )
+        else:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:  # noqa: BLE001 - e.g. the BPE file cannot be downloaded
+                logger.warning(
+                    "Could not load the tiktoken encoding for %s; estimating prompt tokens",
+                    model,
+                    exc_info=True,
+                )
+        self.name = self._encoding.name if self._encoding else "estimate"
+
+    @staticmethod
+    def _char_costs(text: str) -> list[float]:
+        return [0.25 if ord(char) < 128 else 1.0 for char in text]
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+    def count_message(self, message: dict[str, Any]) -> int:
+        return _TOKENS_PER_MESSAGE + self.count(str(message.get("content", "")))
+
+    def count_messages(self, messages: Sequence[dict[str, Any]]) -> int:
+        return _REPLY_PRIMING_TOKENS + sum(self.count_message(m) for m in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` within ``max_tokens``."""
+
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return self._encoding.decode(tokens[:max_tokens])
+        spent = 0.0
+        for idx, cost in enumerate(self._char_costs(text)):
+            spent += cost
+            if math.ceil(spent) > max_tokens:
+                return text[:idx]
+        return text
+
+
+@lru_cache()
+def get_token_counter(model: str) -> TokenCounter:
+    """Return the shared token counter for ``model``."""
+
+    return TokenCounter(model)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split on sentence punctuation and line breaks, keeping the delimiters."""
+
+    return [match.group(0) for match in _SENTENCE_PATTERN.finditer(text) if match.group(0).strip()]
+
+
+def extract_relevant(text: str, query: str, max_tokens: int, counter: TokenCounter) -> str:
+    """Keep the sentences of ``text`` sharing most terms with ``query``.
+
+    Sentences are picked by query-term overlap (ties favour earlier ones)
+    while they fit in ``max_tokens``, then emitted in their original order
+    with an ellipsis marking each gap. A single oversized sentence is cut.
+    """
+
+    if counter.count(text) <= max_tokens:
+        return text
+    sentences = split_sentences(text)
+    query_terms = set(tokenize(query))
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda idx: (-len(query_terms.intersection(tokenize(sentences[idx]))), idx),
+    )
+    chosen: list[int] = []
+    spent = 0
+    for idx in ranked:
+        cost = counter.count(sentences[idx].strip()) + counter.count(_ELLIPSIS)
+        if spent + cost <= max_tokens:
+            chosen.append(idx)
+            spent += cost
+    if not chosen:
+        return counter.truncate(sentences[ranked[0]].strip() if sentences else text, max_tokens)
+
+    parts: list[str] = []
+    previous = -1
+    for idx in sorted(chosen):
+        if idx != previous + 1:
+            parts.append(_ELLIPSIS.strip())
+        parts.append(sentences[idx].strip())
+        previous = idx
+    if previous != len(sentences) - 1:
+        parts.append(_ELLIPSIS.strip())
+    return " ".join(parts)
+
+
+@dataclass
+class MemoryEntry:
+    """One memory to place in the prompt: fixed framing plus a trimmable body."""
+
+    header: str
+    body: str
+    footer: str
+    score: float | None
+
+    def render(self, body: str | None = None) -> str:
+        return f"{self.header}{self.body if body is None else body}{self.footer}"
+
+
+@dataclass
+class BudgetedContext:
+    """Result of fitting memories and history into a prompt budget."""
+
+    snippets: list[str | None]
+    history: list[dict[str, Any]]
+    budget_tokens: int
+    memory_tokens: int = 0
+    history_tokens: int = 0
+    trimmed_memories: int = 0
+    dropped_memories: int = 0
+    dropped_history: int = 0
+    tokenizer: str = "estimate"
+
+
+class ContextBudgeter:
+    """Splits a prompt token budget between conversation history and memories.
+
+    History (newest first) may take up to ``history_ratio`` of what is left
+    after the fixed prompt. Memories share the rest in proportion to their
+    relevance score: short memories are kept whole and their unused share
+    flows to the others, long ones are reduced to their most relevant
+    sentences, and the lowest-scored are dropped when a share would fall
+    below ``min_memory_tokens``. Budget the memories leave unused goes back
+    to history.
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        *,
+        max_tokens: int,
+        history_ratio: float,
+        min_memory_tokens: int,
+    ):
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self.history_ratio = history_ratio
+        self.min_memory_tokens = min_memory_tokens
+
+    def build(
+        self,
+        *,
+        query: str,
+        base_tokens: int,
+        memories: Sequence[MemoryEntry],
+        history: Sequence[dict[str, Any]],
+        separator: str = "\n\n",
+    ) -> BudgetedContext:
+        """Fit ``memories`` and ``history`` next to a ``base_tokens`` prompt."""
+
+        available = max(0, self.max_tokens - base_tokens)
+        history_costs = [self.counter.count_message(entry) for entry in history]
+        reserved = min(sum(history_costs), int(available * self.history_ratio))
+
+        snippets, memory_tokens, trimmed, dropped = self._fit_memories(
+            query, memories, available - reserved, self.counter.count(separator)
+        )
+        kept_history, history_tokens = self._fit_history(
+            history, history_costs, available - memory_tokens
+        )
+        return BudgetedContext(
+            snippets=snippets,
+            history=kept_history,
+            budget_tokens=self.max_tokens,
+            memory_tokens=memory_tokens,
+            history_tokens=history_tokens,
+            trimmed_memories=trimmed,
+            dropped_memories=dropped,
+            dropped_history=len(history) - len(kept_history),
+            tokenizer=self.counter.name,
+        )
+
+    @staticmethod
+    def _fit_history(
+        history: Sequence[dict[str, Any]], costs: list[int], budget: int
+    ) -> tuple[list[dict[str, Any]], int]:
+        kept = 0
+        spent = 0
+        for cost in reversed(costs):
+            if spent + cost > budget:
+                break
+            spent += cost
+            kept += 1
+        return list(history[len(history) - kept :]), spent
+
+    @staticmethod
+    def _weights(memories: Sequence[MemoryEntry]) -> list[float]:
+        scores = [memory.score for memory in memories if memory.score is not None]
+        # Explicitly requested memories carry no score; rank them with the best.
+        default = max(scores) if scores else 1.0
+        floor = 1e-6
+        return [
+            max(default if memory.score is None else memory.score, floor) for memory in memories
+        ]
+
+    def _fit_memories(
+        self,
+        query: str,
+        memories: Sequence[MemoryEntry],
+        budget: int,
+        separator_tokens: int,
+    ) -> tuple[list[str | None], int, int, int]:
+        counter = self.counter
+        weights = self._weights(memories)
+        fixed = [
+            counter.count(memory.render("")) + separator_tokens for memory in memories
+        ]
+        full = [
+            counter.count(memory.render()) + separator_tokens for memory in memories
+        ]
+        allocation: dict[int, int] = {}
+        remaining = budget
+        pending = sorted(range(len(memories)), key=lambda idx: -weights[idx])
+
+        # Water-filling: memories that fit whole in their share keep everything.
+        while pending:
+            total = sum(weights[idx] for idx in pending)
+            fits = [idx for idx in pending if full[idx] <= remaining * weights[idx] / total]
+            if not fits:
+                break
+            for idx in fits:
+                allocation[idx] = full[idx]
+                remaining -= full[idx]
+            pending = [idx for idx in pending if idx not in allocation]
+
+        # Drop the lowest-scored until every share leaves room for a body.
+        while pending:
+            total = sum(weights[idx] for idx in pending)
+            lowest = pending[-1]
+            if remaining * weights[lowest] / total >= fixed[lowest] + self.min_memory_tokens:
+                break
+            pending.pop()
+
+        total = sum(weights[idx] for idx in pending)
+        snippets: list[str | None] = [None] * len(memories)
+        spent = 0
+        for idx, memory in enumerate(memories):
+            if idx in allocation:
+                snippets[idx] = memory.render()
+                spent += full[idx]
+        for idx in pending:
+            share = int(remaining * weights[idx] / total)
+            body = extract_relevant(memories[idx].body, query, share - fixed[idx], counter)
+            snippets[idx] = memories[idx].render(body)
+            spent += counter.count(snippets[idx]) + separator_tokens
+
+        dropped = len(memories) - len(allocation) - len(pending)
+        return snippets, spent, len(pending), dropped
@@ -0,0 +1,276 @@
+"""Content-addressed cache for text embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from app.config import get_settings
+
+
+def content_hash(model: str, text: str) -> str:
+    """Stable key for an embedding of ``text`` produced by ``model``."""
+
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def query_key(model: str, text: str) -> str:
+    """Cache key for a search query: NFKC-normalized with whitespace collapsed.
+
+    Case is kept because embedding models are case-sensitive.
+    """
+
+    return content_hash(model, " ".join(unicodedata.normalize("NFKC", text).split()))
+
+
+class EmbeddingCache:
+    """In-memory LRU of embeddings backed by an optional SQLite file.
+
+    Keys are ``content_hash`` values, so identical texts embedded with the
+    same model share an entry across owners, reindex runs and restarts.
+    The file keeps at most ``max_disk_entries`` rows, dropping the least
+    recently used; hits only bump ``last_used`` when the file is pruned, so
+    lookups stay read-only.
+    """
+
+    def __init__(self, max_entries: int, path: Path | None = None, max_disk_entries: int = 0):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._used: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, "
+                "dtype TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                self._db.execute(
+                    "ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0"
+                )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+            )
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        assert self._db is not None
+        if self._used:
+            self._db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._used.items()],
+            )
+            self._used.clear()
+        if self.max_disk_entries > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key NOT IN "
+                "(SELECT key FROM embeddings ORDER BY last_used DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            )
+        self._db.commit()
+
+    def _touch(self, key: str) -> None:
+        if self._db is None:
+            return
+        self._used[key] = time.time()
+        if len(self._used) >= max(self.max_entries, 1):
+            self._prune_disk()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._touch(key)
+                return vector
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT dtype, vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            vector = np.frombuffer(row[1], dtype=np.dtype(row[0]))
+            self._remember(key, vector)
+            self._touch(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        self.put_many({key: vector})
+
+    def put_many(self, vectors: dict[str, np.ndarray]) -> None:
+        now = time.time()
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, np.asarray(vector))
+            if self._db is not None and vectors:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dtype, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (key, np.asarray(vector).dtype.name, np.asarray(vector).tobytes(), now)
+                        for key, vector in vectors.items()
+                    ],
+                )
+                for key in vectors:
+                    self._used.pop(key, None)
+                interval = max(self.max_entries, 1)
+                previous, self._puts = self._puts, self._puts + len(vectors)
+                if previous // interval != self._puts // interval:
+                    self._prune_disk()
+                else:
+                    self._db.commit()
+
+
+class QueryEmbeddingCache:
+    """LRU of query embeddings whose entries expire after ``ttl_seconds``.
+
+    Shared by all requests of a process; with ``path`` entries also survive
+    restarts in a SQLite file. ``stats`` reports hit/miss counters.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: Path | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._puts = 0
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, "
+                "dtype TEXT NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        assert self._db is not None
+        self._db.execute(
+            "DELETE FROM query_embeddings WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        self._db.commit()
+
+    def _remember(self, key: str, created_at: float, vector: np.ndarray) -> None:
+        self._entries[key] = (created_at, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> np.ndarray | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, vector = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return vector
+                del self._entries[key]
+                self._expired += 1
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT dtype, vector, created_at FROM query_embeddings "
+                    "WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[1], dtype=np.dtype(row[0]))
+                    self._remember(key, row[2], vector)
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return vector
+            self._misses += 1
+            return None
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        vector = np.asarray(vector)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, vector)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, dtype, vector, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, vector.dtype.name, vector.tobytes(), now),
+            )
+            self._puts += 1
+            if self._puts % max(self.max_entries, 1) == 0:
+                self._prune_disk()
+            else:
+                self._db.commit()
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "entries": len(self._entries),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache()
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache."""
+
+    settings = get_settings()
+    path = (
+        settings.storage_dir / "query_embedding_cache.sqlite3"
+        if settings.rag_query_cache_disk
+        else None
+    )
+    return QueryEmbeddingCache(
+        settings.rag_query_cache_size, settings.rag_query_cache_ttl_seconds, path
+    )
+
+
+@lru_cache()
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache."""
+
+    settings = get_settings()
+    path = (
+        settings.storage_dir / "embedding_cache.sqlite3"
+        if settings.rag_embedding_cache_disk
+        else None
+    )
+    return EmbeddingCache(
+        settings.rag_embedding_cache_size, path, settings.rag_embedding_cache_disk_max_entries
+    )
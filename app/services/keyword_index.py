@@ -0,0 +1,165 @@
+"""In-process BM25 keyword index used alongside vector search."""
+
+from __future__ import annotations
+
+import math
+import re
+import uuid
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+from app.services.vector_cache import select_top_k
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# Standard Okapi BM25 parameters.
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_POSTING_OVERHEAD_BYTES = 100  # rough cost of one dict entry in a posting list
+
+
+def tokenize(text: str, char_ngram: int = 2) -> list[str]:
+    """Lowercased word tokens plus ``#``-prefixed n-grams of Hangul words.
+
+    Korean attaches particles to nouns ("회의록을"), so character n-grams
+    let inflected forms share terms; ``char_ngram=0`` disables them.
+    """
+
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    features = list(tokens)
+    if char_ngram > 0 and _HANGUL_PATTERN.search(text):
+        for token in tokens:
+            if len(token) >= char_ngram and _HANGUL_PATTERN.search(token):
+                features.extend(
+                    "#" + token[start : start + char_ngram]
+                    for start in range(len(token) - char_ngram + 1)
+                )
+    return features
+
+
+class OwnerKeywords:
+    """Inverted index with BM25 scoring over one owner's memory texts.
+
+    Documents live in rows parallel to ``ids``; postings map a term to
+    ``{row: term frequency}``. Removal moves the last row into the freed
+    slot, mirroring ``OwnerVectors`` so both stay O(1) per update.
+    """
+
+    def __init__(self, char_ngram: int = 2):
+        self.char_ngram = char_ngram
+        self.ids: list[uuid.UUID] = []
+        self.rows: dict[uuid.UUID, int] = {}
+        self._terms: list[Counter[str]] = []
+        self._lengths: list[int] = []
+        self._postings: dict[str, dict[int, int]] = {}
+        self._total_length = 0
+        self._posting_count = 0
+
+    @classmethod
+    def from_documents(
+        cls, documents: Iterable[tuple[uuid.UUID, str]], *, char_ngram: int = 2
+    ) -> "OwnerKeywords":
+        index = cls(char_ngram)
+        for memory_id, text in documents:
+            index.upsert(memory_id, text)
+        return index
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self._posting_count * _POSTING_OVERHEAD_BYTES + self.size * 200
+
+    def _unlink(self, row: int) -> None:
+        for term in self._terms[row]:
+            posting = self._postings[term]
+            del posting[row]
+            if not posting:
+                del self._postings[term]
+        self._posting_count -= len(self._terms[row])
+        self._total_length -= self._lengths[row]
+
+    def upsert(self, memory_id: uuid.UUID, text: str) -> None:
+        terms = Counter(tokenize(text, self.char_ngram))
+        row = self.rows.get(memory_id)
+        if row is None:
+            row = self.size
+            self.ids.append(memory_id)
+            self.rows[memory_id] = row
+            self._terms.append(Counter())
+            self._lengths.append(0)
+        else:
+            self._unlink(row)
+
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[row] = count
+        self._terms[row] = terms
+        self._lengths[row] = sum(terms.values())
+        self._total_length += self._lengths[row]
+        self._posting_count += len(terms)
+
+    def discard(self, memory_id: uuid.UUID) -> bool:
+        row = self.rows.pop(memory_id, None)
+        if row is None:
+            return False
+        self._unlink(row)
+        last = self.size - 1
+        if row != last:
+            moved_id = self.ids[last]
+            for term in self._terms[last]:
+                posting = self._postings[term]
+                posting[row] = posting.pop(last)
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+            self._terms[row] = self._terms[last]
+            self._lengths[row] = self._lengths[last]
+        self.ids.pop()
+        self._terms.pop()
+        self._lengths.pop()
+        return True
+
+    def top_k(
+        self,
+        query: str,
+        k: int,
+        *,
+        allowed: Iterable[uuid.UUID] | None = None,
+    ) -> list[tuple[uuid.UUID, float]]:
+        """Return up to ``k`` (memory_id, BM25 score) pairs with a positive score.
+
+        With ``allowed`` only those memories can be returned.
+        """
+
+        if not self.size or k <= 0:
+            return []
+        terms = set(tokenize(query, self.char_ngram))
+        lengths = np.asarray(self._lengths, dtype=np.float32)
+        norm = _BM25_K1 * (
+            1 - _BM25_B + _BM25_B * lengths / max(self._total_length / self.size, 1.0)
+        )
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            rows = np.fromiter(posting.keys(), dtype=np.int64, count=df)
+            tf = np.fromiter(posting.values(), dtype=np.float32, count=df)
+            scores[rows] += idf * tf * (_BM25_K1 + 1) / (tf + norm[rows])
+
+        keep = scores > 0
+        if allowed is not None:
+            permitted = np.zeros(self.size, dtype=bool)
+            allowed_rows = [
+                self.rows[memory_id] for memory_id in allowed if memory_id in self.rows
+            ]
+            permitted[allowed_rows] = True
+            keep &= permitted
+        scores = np.where(keep, scores, -np.inf)
+        return [(self.ids[row], float(scores[row])) for row in select_top_k(scores, k)]
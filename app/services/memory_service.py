@@ -5,8 +5,9 @@ from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.models import Memory
-from app.repositories import MemoryRepository
+from app.repositories import MemoryRepository, WorkflowEventRepository
 from app.schemas import MemoryCreate, MemoryUpdate
 from app.workflows import workflow_engine
 
@@ -17,6 +18,14 @@ class MemoryService:
     def __init__(self, session: Session):
         self.session = session
         self.repo = MemoryRepository(session)
+        self.events = WorkflowEventRepository(session)
+        self.settings = get_settings()
+
+    def _stage_event(self, event: str, payload: dict[str, str]) -> None:
+        """Write an outbox row in the same transaction as the memory change."""
+
+        if self.settings.workflow_async_enabled and self.settings.workflow_outbox_enabled:
+            self.events.add(event, payload)
 
     def create_memory(self, payload: MemoryCreate) -> Memory:
         ingested_at = datetime.now(timezone.utc)
@@ -26,6 +35,7 @@ class MemoryService:
         context_data.setdefault("ingested_at", ingested_at.isoformat())
 
         memory = Memory(
+            id=uuid.uuid4(),
             owner_id=payload.owner_id,
             title=payload.title,
             content=payload.content,
@@ -35,6 +45,7 @@ class MemoryService:
             source_location=payload.source_location,
             context=context_data,
         )
+        self._stage_event("memory.created", {"memory_id": str(memory.id)})
         memory = self.repo.create(memory)
         workflow_engine.trigger(
             "memory.created",
@@ -65,6 +76,7 @@ class MemoryService:
         if payload.context is not None:
             memory.context = payload.context
         memory.updated_at = datetime.now(timezone.utc)
+        self._stage_event("memory.updated", {"memory_id": str(memory.id)})
         memory = self.repo.update(memory)
         workflow_engine.trigger(
             "memory.updated",
@@ -75,10 +87,15 @@ class MemoryService:
 
     def delete_memory(self, memory: Memory) -> None:
         memory_id = memory.id
+        owner_id = memory.owner_id
+        self._stage_event(
+            "memory.deleted",
+            {"memory_id": str(memory_id), "owner_id": str(owner_id)},
+        )
         self.repo.delete(memory)
         workflow_engine.trigger(
             "memory.deleted",
             session=self.session,
-            payload={"memory_id": memory_id},
+            payload={"memory_id": memory_id, "owner_id": owner_id},
         )
 
@@ -0,0 +1,147 @@
+"""Sentence embeddings computed locally on CPU with onnxruntime."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddingBackend:
+    """Runs an exported sentence-transformer (e.g. multilingual MiniLM/E5).
+
+    ``model_dir`` must contain ``model.onnx`` and a Hugging Face
+    ``tokenizer.json``. Token embeddings are mean-pooled over the attention
+    mask unless the model already outputs a pooled 2-D sentence embedding.
+    Inputs are sorted by length and packed into batches of at most
+    ``batch_tokens`` padded tokens, so short texts are not padded to the
+    longest one in the request. With ``quantize`` an int8 copy
+    (``model_quantized.onnx``) is used, created with dynamic quantization on
+    first load if missing.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        *,
+        threads: int = 0,
+        quantize: bool = False,
+        max_length: int = 256,
+        batch_tokens: int = 8192,
+    ):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "ONNX embeddings require the 'onnxruntime' and 'tokenizers' packages"
+            ) from exc
+
+        model_path = model_dir / "model.onnx"
+        if quantize:
+            model_path = self._quantized_model(model_path)
+
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.no_padding()
+
+        self.max_length = max_length
+        self.batch_tokens = max(batch_tokens, max_length)
+        self.name = f"onnx-{model_dir.name}{'-int8' if quantize else ''}"
+
+    @staticmethod
+    def _quantized_model(model_path: Path) -> Path:
+        quantized_path = model_path.with_name("model_quantized.onnx")
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info("Quantizing %s to int8", model_path)
+            quantize_dynamic(
+                str(model_path), str(quantized_path), weight_type=QuantType.QInt8
+            )
+        return quantized_path
+
+    def _batches(self, lengths: list[int]) -> list[list[int]]:
+        """Group indices (shortest first) so padded tokens stay within budget."""
+
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batches: list[list[int]] = []
+        current: list[int] = []
+        for index in order:
+            # Sorted ascending, so the newest item sets the padded width.
+            if current and lengths[index] * (len(current) + 1) > self.batch_tokens:
+                batches.append(current)
+                current = []
+            current.append(index)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _run(self, encodings: list) -> np.ndarray:
+        width = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, : len(encoding.ids)] = encoding.ids
+            attention_mask[row, : len(encoding.ids)] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        output = self._session.run(None, feeds)[0]
+
+        if output.ndim == 2:
+            pooled = output.astype(np.float32)
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        encodings = self._tokenizer.encode_batch(list(texts))
+        lengths = [max(1, len(encoding.ids)) for encoding in encodings]
+        rows: dict[int, np.ndarray] = {}
+        for batch in self._batches(lengths):
+            vectors = self._run([encodings[index] for index in batch])
+            rows.update(zip(batch, vectors))
+        return np.stack([rows[index] for index in range(len(texts))])
+
+
+@lru_cache()
+def get_onnx_backend() -> OnnxEmbeddingBackend:
+    """Return the process-wide ONNX backend (the model is loaded once)."""
+
+    settings = get_settings()
+    if settings.rag_onnx_model_dir is None:
+        raise RuntimeError("MINDDOCK_RAG_ONNX_MODEL_DIR is not configured")
+    return OnnxEmbeddingBackend(
+        settings.rag_onnx_model_dir,
+        threads=settings.rag_onnx_threads,
+        quantize=settings.rag_onnx_quantize,
+        max_length=settings.rag_onnx_max_length,
+        batch_tokens=settings.rag_onnx_batch_tokens,
+    )
@@ -0,0 +1,208 @@
+"""Process-wide OpenAI clients shared by all services."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+from functools import lru_cache
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Status codes the OpenAI SDK retries on.
+_RETRYABLE_STATUS = frozenset({408, 409, 429}) | frozenset(range(500, 600))
+
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of recent requests.
+
+    Every first attempt deposits ``ratio`` tokens (up to ``min_reserve +
+    ratio * 1000``); every retry spends one. When the bucket is empty,
+    failures are returned without retry, so an upstream outage does not
+    multiply the request rate by ``max_retries``.
+    """
+
+    def __init__(self, ratio: float, min_reserve: int):
+        self.ratio = ratio
+        self.capacity = min_reserve + ratio * 1000
+        self._tokens = float(min_reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def check(self, request: httpx.Request, response: httpx.Response) -> None:
+        """Account for one attempt; veto the SDK's retry if over budget."""
+
+        if response.status_code in _RETRYABLE_STATUS and not self.withdraw():
+            # The SDK honours this header before its own retry rules.
+            response.headers["x-should-retry"] = "false"
+
+    def on_request(self, request: httpx.Request) -> None:
+        if request.headers.get("x-stainless-retry-count", "0") == "0":
+            self.deposit()
+
+
+class _BudgetedTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, budget: RetryBudget):
+        self._inner = inner
+        self._budget = budget
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._budget.on_request(request)
+        response = self._inner.handle_request(request)
+        self._budget.check(request, response)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class _AsyncBudgetedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, budget: RetryBudget):
+        self._inner = inner
+        self._budget = budget
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._budget.on_request(request)
+        response = await self._inner.handle_async_request(request)
+        self._budget.check(request, response)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class OpenAIClientRegistry:
+    """Builds the shared sync and async OpenAI clients on first use.
+
+    Both sit on pooled httpx clients with keep-alive, optional HTTP/2 and
+    the configured timeouts, retries and retry budget, and are safe to share
+    across threads. ``MINDDOCK_OPENAI_BASE_URL`` points them at a stand-in
+    server, and ``override`` swaps in prebuilt clients, e.g. in tests.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.budget = RetryBudget(
+            settings.openai_retry_budget_ratio, settings.openai_retry_budget_min
+        )
+        self._http2 = settings.openai_http2
+        if self._http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is missing; using HTTP/1.1")
+            self._http2 = False
+        self._sync: OpenAI | None = None
+        self._async: AsyncOpenAI | None = None
+        self._lock = threading.Lock()
+
+    def _pool_options(self) -> dict:
+        settings = self.settings
+        return {
+            "limits": httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+            ),
+            "http2": self._http2,
+        }
+
+    def _client_options(self) -> dict:
+        settings = self.settings
+        if not settings.openai_api_key:
+            raise RuntimeError("OpenAI API key is not configured")
+        return {
+            "api_key": settings.openai_api_key,
+            "base_url": settings.openai_base_url,
+            "max_retries": settings.openai_max_retries,
+            "timeout": httpx.Timeout(
+                settings.openai_timeout_seconds,
+                connect=settings.openai_connect_timeout_seconds,
+            ),
+        }
+
+    def sync_client(self) -> OpenAI:
+        with self._lock:
+            if self._sync is None:
+                options = self._client_options()
+                transport = _BudgetedTransport(
+                    httpx.HTTPTransport(**self._pool_options()), self.budget
+                )
+                self._sync = OpenAI(
+                    **options,
+                    http_client=httpx.Client(transport=transport, timeout=options["timeout"]),
+                )
+            return self._sync
+
+    def async_client(self) -> AsyncOpenAI:
+        with self._lock:
+            if self._async is None:
+                options = self._client_options()
+                transport = _AsyncBudgetedTransport(
+                    httpx.AsyncHTTPTransport(**self._pool_options()), self.budget
+                )
+                self._async = AsyncOpenAI(
+                    **options,
+                    http_client=httpx.AsyncClient(
+                        transport=transport, timeout=options["timeout"]
+                    ),
+                )
+            return self._async
+
+    def override(
+        self, *, sync: OpenAI | None = None, async_: AsyncOpenAI | None = None
+    ) -> None:
+        """Replace the shared clients (None leaves a client unchanged)."""
+
+        with self._lock:
+            if sync is not None:
+                self._sync = sync
+            if async_ is not None:
+                self._async = async_
+
+    async def aclose(self) -> None:
+        with self._lock:
+            sync_client, async_client = self._sync, self._async
+            self._sync = self._async = None
+        if sync_client is not None:
+            sync_client.close()
+        if async_client is not None:
+            await async_client.close()
+
+
+@lru_cache()
+def get_openai_clients() -> OpenAIClientRegistry:
+    """Return the process-wide client registry."""
+
+    return OpenAIClientRegistry(get_settings())
+
+
+def get_openai_client() -> OpenAI:
+    """Return the shared synchronous OpenAI client."""
+
+    return get_openai_clients().sync_client()
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the shared ``AsyncOpenAI`` client."""
+
+    return get_openai_clients().async_client()
+
+
+async def close_openai_clients() -> None:
+    """Close the shared clients if they were created."""
+
+    if get_openai_clients.cache_info().currsize:
+        await get_openai_clients().aclose()
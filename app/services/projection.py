@@ -0,0 +1,127 @@
+"""Offline-fitted PCA projections that shrink embedding dimensions."""
+
+from __future__ import annotations
+
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+from app.services.quantization import normalize_rows
+
+if TYPE_CHECKING:
+    from app.services.rag_service import EmbeddingBackend
+
+logger = logging.getLogger(__name__)
+
+
+def projection_path(storage_dir: Path, source: str, dim: int) -> Path:
+    """Where the projection from ``source`` embeddings down to ``dim`` lives."""
+
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", source)
+    return storage_dir / "projections" / f"{slug}-{dim}.npz"
+
+
+class PCAProjection:
+    """Maps unit vectors to ``dim`` principal components, re-normalized.
+
+    Fitted on stored unit-normalized embeddings of one ``source`` model, so
+    cosine scores in the reduced space approximate the original ones.
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, *, source: str):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.source = source
+
+    @property
+    def dim(self) -> int:
+        return int(self.components.shape[0])
+
+    @property
+    def input_dim(self) -> int:
+        return int(self.components.shape[1])
+
+    @classmethod
+    def fit(cls, sample: np.ndarray, dim: int, *, source: str) -> "PCAProjection":
+        """Fit on a (rows x input_dim) sample via the covariance eigendecomposition."""
+
+        unit_rows, valid = normalize_rows(sample)
+        unit_rows = unit_rows[valid]
+        if dim <= 0 or dim >= unit_rows.shape[1]:
+            raise ValueError(
+                f"Target dimension must be between 1 and {unit_rows.shape[1] - 1}"
+            )
+        if unit_rows.shape[0] <= dim:
+            raise ValueError(f"Need more than {dim} stored vectors to fit, got {unit_rows.shape[0]}")
+
+        mean = unit_rows.mean(axis=0)
+        centered = unit_rows - mean
+        covariance = (centered.T @ centered) / (centered.shape[0] - 1)
+        _, eigenvectors = np.linalg.eigh(covariance.astype(np.float64))
+        # eigh sorts eigenvalues ascending; keep the largest ``dim``.
+        components = eigenvectors[:, ::-1][:, :dim].T
+        return cls(mean, components, source=source)
+
+    def explained_variance(self, sample: np.ndarray) -> float:
+        """Fraction of the sample's variance kept by the projection."""
+
+        unit_rows, valid = normalize_rows(sample)
+        centered = unit_rows[valid] - self.mean
+        total = float(np.einsum("ij,ij->", centered, centered))
+        reduced = centered @ self.components.T
+        return float(np.einsum("ij,ij->", reduced, reduced)) / total if total else 0.0
+
+    def apply(self, matrix: np.ndarray) -> np.ndarray:
+        """Project rows and re-normalize; zero rows stay zero."""
+
+        unit_rows, valid = normalize_rows(matrix)
+        projected, _ = normalize_rows((unit_rows - self.mean) @ self.components.T)
+        projected[~valid] = 0.0
+        return projected
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, mean=self.mean, components=self.components, source=self.source)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PCAProjection":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"], source=str(data["source"]))
+
+
+@lru_cache()
+def load_projection(storage_dir: Path, source: str, dim: int) -> PCAProjection | None:
+    """Return the fitted projection for ``source`` -> ``dim``, or None if absent."""
+
+    path = projection_path(storage_dir, source, dim)
+    if not path.exists():
+        return None
+    projection = PCAProjection.load(path)
+    if projection.source != source or projection.dim != dim:
+        logger.warning("Ignoring projection %s fitted for %s", path, projection.source)
+        return None
+    return projection
+
+
+class ProjectedEmbeddingBackend:
+    """Wraps a backend so its vectors are reduced by a ``PCAProjection``."""
+
+    def __init__(self, base: EmbeddingBackend, projection: PCAProjection):
+        self.base = base
+        self.projection = projection
+        self.name = f"{base.name}+pca{projection.dim}"
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = self.base.embed_batch(texts)
+        if matrix.shape[-1] != self.projection.input_dim:
+            return np.zeros((len(texts), self.projection.dim), dtype=np.float32)
+        return self.projection.apply(matrix)
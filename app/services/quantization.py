@@ -0,0 +1,51 @@
+"""Reduced-precision encodings for unit-normalized embedding rows."""
+
+from __future__ import annotations
+
+import numpy as np
+
+_INT8_MAX = 127.0
+
+
+def normalize_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return float32 unit rows and a mask of rows that had a non-zero norm."""
+
+    matrix = np.array(matrix, dtype=np.float32, order="C", ndmin=2)
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    valid = norms > 0
+    matrix /= np.where(valid, norms, 1.0)[:, None]
+    return matrix, valid
+
+
+def quantize_rows(unit_rows: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray]:
+    """Encode unit rows as ``dtype`` values plus a float32 scale per row.
+
+    ``values * scale`` approximates the original row. int8 uses symmetric
+    per-row max-abs scaling, so each row spends its full [-127, 127] range.
+    """
+
+    scales = np.ones(unit_rows.shape[0], dtype=np.float32)
+    if dtype == "float32":
+        return np.ascontiguousarray(unit_rows, dtype=np.float32), scales
+    if dtype == "float16":
+        return unit_rows.astype(np.float16), scales
+    if dtype == "int8":
+        max_abs = np.abs(unit_rows).max(axis=1) if unit_rows.size else scales * 0
+        scales = np.where(max_abs > 0, max_abs / _INT8_MAX, 1.0).astype(np.float32)
+        values = np.rint(unit_rows / scales[:, None]).astype(np.int8)
+        return values, scales
+    raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+
+def encode_for_storage(matrix: np.ndarray, dtype: str) -> np.ndarray:
+    """Encode rows for persistence; float32 rows are written unchanged.
+
+    Scales are not stored: loaded rows are re-normalized, which recovers the
+    same direction, and cosine scores ignore magnitude.
+    """
+
+    if dtype == "float32":
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+    unit_rows, _ = normalize_rows(matrix)
+    values, _ = quantize_rows(unit_rows, dtype)
+    return values
@@ -2,22 +2,49 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import re
 import uuid
 from dataclasses import dataclass
-from typing import Iterable, Protocol
+from functools import lru_cache
+from typing import Callable, Iterator, Protocol, Sequence
 
 import numpy as np
-from openai import OpenAI
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.models import Memory
 from app.repositories import MemoryEmbeddingRepository, MemoryRepository
+from app.schemas import MemorySearchFilters
+from app.services.embedding_cache import (
+    EmbeddingCache,
+    content_hash,
+    get_embedding_cache,
+    get_query_embedding_cache,
+    query_key,
+)
+from app.services.keyword_index import OwnerKeywords, tokenize
+from app.services.onnx_embedding import get_onnx_backend
+from app.services.openai_clients import get_async_openai_client, get_openai_client
+from app.services.projection import (
+    PCAProjection,
+    ProjectedEmbeddingBackend,
+    load_projection,
+    projection_path,
+)
+from app.services.quantization import encode_for_storage, normalize_rows
+from app.services.vector_cache import OwnerVectors, RowFilters, get_vector_cache
 
 logger = logging.getLogger(__name__)
 
+# OpenAI accepts up to 2048 inputs and roughly 300k tokens per embeddings call.
+_OPENAI_MAX_BATCH_ITEMS = 2048
+_OPENAI_MAX_BATCH_TOKENS = 250_000
+_WHITESPACE = re.compile(r"\s")
+
 
 class EmbeddingBackend(Protocol):
     """Protocol for embedding providers."""
@@ -27,46 +54,211 @@ class EmbeddingBackend(Protocol):
     def embed(self, text: str) -> np.ndarray:
         """Return a vector representation for text."""
 
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a (len(texts), dim) matrix with one row per text."""
+
 
 class OpenAIEmbeddingBackend:
-    """Embedding backend powered by OpenAI's embeddings API."""
+    """Embedding backend powered by OpenAI's embeddings API.
 
-    def __init__(self, api_key: str, model_name: str):
-        self.name = f"openai::{model_name}"
-        self._client = OpenAI(api_key=api_key)
+    ``dimensions`` asks text-embedding-3 models for shortened (Matryoshka)
+    vectors, which equal the full vector truncated and re-normalized.
+    """
+
+    def __init__(self, model_name: str, dimensions: int | None = None):
+        self.name = f"openai::{model_name}" + (f"@{dimensions}" if dimensions else "")
+        self.base_name = f"openai::{model_name}"
+        self.dimensions = dimensions
+        self._client = get_openai_client()
         self._model_name = model_name
 
+    def _request(self, inputs: list[str]) -> dict:
+        request: dict = {"model": self._model_name, "input": inputs}
+        if self.dimensions:
+            request["dimensions"] = self.dimensions
+        return request
+
+    def _create(self, inputs: list[str]):
+        return self._client.embeddings.create(**self._request(inputs))
+
     def embed(self, text: str) -> np.ndarray:
         if not text.strip():
             return np.zeros(1, dtype=np.float32)
-        response = self._client.embeddings.create(model=self._model_name, input=[text])
+        response = self._create([text])
         vector = response.data[0].embedding
         return np.asarray(vector, dtype=np.float32)
 
+    async def aembed(self, text: str) -> np.ndarray:
+        if not text.strip():
+            return np.zeros(1, dtype=np.float32)
+        response = await get_async_openai_client().embeddings.create(
+            **self._request([text])
+        )
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Conservative without a tokenizer: ~1 token per Hangul syllable
+        # (3 UTF-8 bytes) and fewer than that for Latin text.
+        return len(text.encode("utf-8")) // 3 + 1
+
+    def _chunks(self, texts: Sequence[str]) -> Iterator[list[int]]:
+        chunk: list[int] = []
+        tokens = 0
+        for index, text in enumerate(texts):
+            cost = self._estimate_tokens(text)
+            if chunk and (
+                len(chunk) >= _OPENAI_MAX_BATCH_ITEMS
+                or tokens + cost > _OPENAI_MAX_BATCH_TOKENS
+            ):
+                yield chunk
+                chunk, tokens = [], 0
+            chunk.append(index)
+            tokens += cost
+        if chunk:
+            yield chunk
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        # Coalesce duplicate and blank inputs so each distinct text is sent once.
+        unique = list(dict.fromkeys(text for text in texts if text.strip()))
+        vectors: dict[str, np.ndarray] = {}
+        for chunk in self._chunks(unique):
+            inputs = [unique[index] for index in chunk]
+            response = self._create(inputs)
+            for item in response.data:
+                vectors[inputs[item.index]] = np.asarray(
+                    item.embedding, dtype=np.float32
+                )
+        return self._assemble(texts, vectors)
+
+    @staticmethod
+    def _assemble(texts: Sequence[str], vectors: dict[str, np.ndarray]) -> np.ndarray:
+        dim = next((vector.size for vector in vectors.values()), 1)
+        matrix = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = vectors.get(text)
+            if vector is not None:
+                matrix[row] = vector
+        return matrix
+
+
+@lru_cache(maxsize=100_000)
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature, identical across processes and runs."""
+
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
 
 class LocalHashEmbeddingBackend:
-    """Lightweight hashing-based embedding for local fallback."""
+    """Lightweight signed feature-hashing embedding for local fallback.
 
-    def __init__(self, dim: int = 512):
+    Words are hashed with BLAKE2b so vectors are reproducible across worker
+    processes and restarts. Hangul words additionally contribute character
+    n-grams of length ``char_ngram`` (0 disables them), which lets inflected
+    forms such as "회의록을" and "회의록" share features.
+    """
+
+    def __init__(self, dim: int = 512, char_ngram: int = 2):
         self.dim = dim
-        self.name = f"local-hash-{dim}"
+        self.char_ngram = char_ngram
+        suffix = f"-ng{char_ngram}" if char_ngram > 0 else ""
+        self.name = f"local-fhash-{dim}{suffix}"
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        rows: list[int] = []
+        hashes: list[int] = []
+        for row, text in enumerate(texts):
+            features = tokenize(text, self.char_ngram)
+            rows.extend([row] * len(features))
+            hashes.extend(_feature_hash(feature) for feature in features)
+
+        size = len(texts) * self.dim
+        if not hashes:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        hashed = np.asarray(hashes, dtype=np.uint64)
+        # The low bits pick the bucket and the top bit the sign, so colliding
+        # features cancel out in expectation instead of piling up.
+        columns = (hashed % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where(hashed >> np.uint64(63), -1.0, 1.0)
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + columns
+        matrix = (
+            np.bincount(flat, weights=signs, minlength=size)
+            .astype(np.float32)
+            .reshape(len(texts), self.dim)
+        )
+        norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))[:, None]
+        matrix /= np.where(norms > 0, norms, 1.0)
+        return matrix
 
-    @staticmethod
-    def _tokenize(text: str) -> Iterable[str]:
-        return re.findall(r"\w+", text.lower())
+
+class CachedEmbeddingBackend:
+    """Wraps a backend so each distinct (model, text) is embedded only once."""
+
+    def __init__(self, backend: EmbeddingBackend, cache: EmbeddingCache):
+        self.name = backend.name
+        self._backend = backend
+        self._cache = cache
 
     def embed(self, text: str) -> np.ndarray:
-        vector = np.zeros(self.dim, dtype=np.float32)
-        tokens = list(self._tokenize(text))
-        if not tokens:
-            return vector
-        for token in tokens:
-            index = hash(token) % self.dim
-            vector[index] += 1.0
-        norm = np.linalg.norm(vector)
-        if norm > 0:
-            vector /= norm
-        return vector
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            self._fill(found, missing, self._backend.embed_batch(list(missing.values())))
+        return self._assemble(keys, found)
+
+    def _lookup(
+        self, texts: Sequence[str]
+    ) -> tuple[list[str], dict[str, np.ndarray | None], dict[str, str]]:
+        """Return (key per text, cached vectors, missing key -> text)."""
+
+        keys = [content_hash(self.name, text) for text in texts]
+        found = {key: self._cache.get(key) for key in dict.fromkeys(keys)}
+        texts_by_key = dict(zip(keys, texts))
+        missing = {key: texts_by_key[key] for key, vector in found.items() if vector is None}
+        return keys, found, missing
+
+    def _fill(
+        self, found: dict[str, np.ndarray | None], missing: dict[str, str], computed: np.ndarray
+    ) -> None:
+        fresh = dict(zip(missing, computed))
+        self._cache.put_many(fresh)
+        found.update(fresh)
+
+    @staticmethod
+    def _assemble(keys: list[str], found: dict[str, np.ndarray | None]) -> np.ndarray:
+        dim = max(vector.size for vector in found.values()) if found else 1
+        matrix = np.zeros((len(keys), dim), dtype=np.float32)
+        for row, key in enumerate(keys):
+            vector = found[key]
+            matrix[row, : vector.size] = vector
+        return matrix
+
+
+def _reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[tuple[uuid.UUID, float]]], *, k: int
+) -> list[tuple[uuid.UUID, float]]:
+    """Merge ranked lists by summing ``1 / (k + rank)`` per memory.
+
+    Equal scores within a list share the better rank, so the result does not
+    depend on the order in which ties happened to be returned.
+    """
+
+    fused: dict[uuid.UUID, float] = {}
+    for ranking in rankings:
+        rank = 0
+        previous: float | None = None
+        for position, (memory_id, score) in enumerate(ranking, start=1):
+            if score != previous:
+                rank, previous = position, score
+            fused[memory_id] = fused.get(memory_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], str(item[0])))
 
 
 @dataclass
@@ -75,6 +267,10 @@ class RAGResult:
 
     memory: Memory
     score: float
+    chunk: str | None = None
+    # Reciprocal-rank fusion score that ordered hybrid results; ``score``
+    # stays the cosine similarity in every retrieval mode.
+    fused_score: float | None = None
 
 
 class RAGService:
@@ -87,18 +283,28 @@ class RAGService:
         self.embedding_repo = MemoryEmbeddingRepository(session)
         self._embedder: EmbeddingBackend | None = None
 
-    def _embedder_instance(self) -> EmbeddingBackend:
-        if self._embedder is not None:
-            return self._embedder
+    def _base_embedder(self) -> EmbeddingBackend:
+        """The configured backend before any PCA projection."""
 
         if not self.settings.rag_enabled:
             raise RuntimeError("RAG is disabled by configuration")
 
-        if self.settings.openai_api_key:
+        backend = self.settings.rag_embedding_backend
+        if backend == "auto":
+            backend = "openai" if self.settings.openai_api_key else "local"
+
+        embedder: EmbeddingBackend | None = None
+        if backend == "onnx":
             try:
-                self._embedder = OpenAIEmbeddingBackend(
-                    api_key=self.settings.openai_api_key,
+                embedder = get_onnx_backend()
+                logger.info("RAG using ONNX embeddings (%s)", embedder.name)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Falling back to local embeddings: %s", exc)
+        elif backend == "openai" and self.settings.openai_api_key:
+            try:
+                embedder = OpenAIEmbeddingBackend(
                     model_name=self.settings.openai_embedding_model,
+                    dimensions=self.settings.rag_embedding_dimensions,
                 )
                 logger.info(
                     "RAG using OpenAI embeddings (%s)",
@@ -106,19 +312,72 @@ class RAGService:
                 )
             except Exception as exc:  # noqa: BLE001
                 logger.warning("Falling back to local embeddings: %s", exc)
-                self._embedder = LocalHashEmbeddingBackend(
-                    dim=self.settings.rag_local_vector_size
-                )
-        else:
-            self._embedder = LocalHashEmbeddingBackend(
-                dim=self.settings.rag_local_vector_size
+
+        if embedder is None:
+            embedder = LocalHashEmbeddingBackend(
+                dim=self.settings.rag_local_vector_size,
+                char_ngram=self.settings.rag_local_char_ngram,
             )
             logger.info(
                 "RAG using local hashing embeddings (dim=%s)",
                 self.settings.rag_local_vector_size,
             )
+        return embedder
+
+    def _embedder_instance(self) -> EmbeddingBackend:
+        if self._embedder is not None:
+            return self._embedder
+
+        embedder = self._base_embedder()
+        dimensions = self.settings.rag_embedding_dimensions
+        if dimensions and not isinstance(embedder, OpenAIEmbeddingBackend):
+            projection = load_projection(self.settings.storage_dir, embedder.name, dimensions)
+            if projection is None:
+                logger.warning(
+                    "No %s-d projection fitted for %s; using full vectors "
+                    "(run `python -m app.cli fit-projection`)",
+                    dimensions,
+                    embedder.name,
+                )
+            else:
+                embedder = ProjectedEmbeddingBackend(embedder, projection)
+        self._embedder = embedder
+        return embedder
 
-        return self._embedder
+    def _index_embedder(self) -> EmbeddingBackend:
+        embedder = self._embedder_instance()
+        if not self.settings.rag_embedding_cache_enabled or isinstance(
+            getattr(embedder, "base", embedder), LocalHashEmbeddingBackend
+        ):
+            return embedder
+        return CachedEmbeddingBackend(embedder, get_embedding_cache())
+
+    def warn_unsearchable_embeddings(self) -> dict[str, int]:
+        """Log stored embeddings that the current embedder will never search.
+
+        Search only reads rows of the current model id, so rows left by a
+        different backend, dimension or an older model id (e.g. the former
+        ``local-hash-*``) stay invisible until reindexed. Returns their
+        count per model.
+        """
+
+        if not self.settings.rag_enabled:
+            return {}
+        current = self._embedder_instance().name
+        other = {
+            model: count
+            for model, count in self.embedding_repo.count_by_model().items()
+            if model != current
+        }
+        if other:
+            logger.warning(
+                "%d stored embeddings use other models than %s (%s) and are not "
+                "searched; run `python -m app.cli reindex` to re-embed them",
+                sum(other.values()),
+                current,
+                ", ".join(f"{model}: {count}" for model, count in sorted(other.items())),
+            )
+        return other
 
     def index_memory(self, memory: Memory) -> None:
         """Add or update a memory's embedding in the vector store."""
@@ -127,79 +386,544 @@ class RAGService:
             logger.debug("RAG disabled; skipping index for memory %s", memory.id)
             return
 
+        self.index_memories([memory])
+
+    def index_memories(self, memories: Sequence[Memory], *, force: bool = False) -> int:
+        """Embed and store several memories with one batched embedding call.
+
+        Memories whose composed text, model, filter attributes and vector
+        dtype match what is stored are skipped unless ``force`` is set;
+        returns the number of memories actually re-embedded. Callers are the
+        workflow workers and the CLI, never a request thread, so there is no
+        async variant.
+        """
+
+        if not self.settings.rag_enabled or not memories:
+            return 0
+
+        embedder = self._index_embedder()
+        pending = self._pending(embedder, memories, force=force)
+        if not pending:
+            return 0
+        vectors = embedder.embed_batch(
+            [chunk for _, _, chunk_texts, _, _ in pending for chunk in chunk_texts]
+        )
+        self._store_vectors(self._regroup(pending, vectors), embedder.name)
+        return len(pending)
+
+    def _pending(
+        self, embedder: EmbeddingBackend, memories: Sequence[Memory], *, force: bool
+    ) -> list[tuple[Memory, str, list[str], list[list[int]] | None, str]]:
+        """(memory, text, chunk texts, spans, digest) of memories needing embedding."""
+
+        texts = [self._compose_memory_text(memory) for memory in memories]
+        chunked = [self._chunk_memory(memory, text) for memory, text in zip(memories, texts)]
+        digests = [
+            self._digest(embedder.name, text, spans)
+            for text, (_, spans) in zip(texts, chunked)
+        ]
+        stored = self.embedding_repo.index_states([memory.id for memory in memories])
+        dtype = self.settings.rag_vector_dtype
+        return [
+            (memory, text, chunk_texts, spans, digest)
+            for memory, text, (chunk_texts, spans), digest in zip(
+                memories, texts, chunked, digests
+            )
+            if force
+            or stored.get(memory.id)
+            != (
+                digest,
+                memory.tags,
+                memory.captured_at,
+                memory.source_device,
+                dtype,
+                self._span_source_hash(memory.content) if spans else None,
+            )
+        ]
+
+    @staticmethod
+    def _regroup(
+        pending: list[tuple[Memory, str, list[str], list[list[int]] | None, str]],
+        vectors: np.ndarray,
+    ) -> list[tuple[Memory, str, np.ndarray, str, list[list[int]] | None]]:
+        """Split the flat chunk matrix back into one (chunks x dim) matrix per memory."""
+
+        items = []
+        offset = 0
+        for memory, text, chunk_texts, spans, digest in pending:
+            matrix = vectors[offset : offset + len(chunk_texts)]
+            offset += len(chunk_texts)
+            items.append((memory, text, matrix, digest, spans))
+        return items
+
+    def _chunk_key(self) -> str:
+        return f"chunks:{self.settings.rag_chunk_size}:{self.settings.rag_chunk_overlap}"
+
+    def _digest(self, model: str, text: str, spans: list[list[int]] | None) -> str:
+        return content_hash(model if spans is None else f"{model}#{self._chunk_key()}", text)
+
+    @staticmethod
+    def _span_source_hash(content: str | None) -> str:
+        return content_hash("chunk-spans", content or "")
+
+    def fit_projection(self, dim: int, *, sample_size: int) -> tuple[PCAProjection, float]:
+        """Fit and save a PCA projection of the base model's stored vectors.
+
+        Returns the projection and the fraction of sample variance it keeps.
+        """
+
+        base = self._base_embedder()
+        records = self.embedding_repo.sample(model=base.name, limit=sample_size)
+        matrices = list(self.embedding_repo.vectors(records).values())
+        if not matrices:
+            raise ValueError(f"No stored {base.name} embeddings to fit a projection on")
+        sample = np.concatenate(matrices)
+        projection = PCAProjection.fit(sample, dim, source=base.name)
+        projection.save(projection_path(self.settings.storage_dir, base.name, dim))
+        load_projection.cache_clear()
+        return projection, projection.explained_variance(sample)
+
+    def _reprojection(self) -> tuple[str, Callable[[np.ndarray], np.ndarray]] | None:
+        """(source model, transform) turning stored full vectors into current ones."""
+
         embedder = self._embedder_instance()
-        text = self._compose_memory_text(memory)
-        vector = embedder.embed(text)
-        if vector.size == 0:
-            logger.debug("Empty embedding produced for memory %s", memory.id)
+        if isinstance(embedder, ProjectedEmbeddingBackend):
+            return embedder.base.name, embedder.projection.apply
+        if isinstance(embedder, OpenAIEmbeddingBackend) and embedder.dimensions:
+            dimensions = embedder.dimensions
+            # Matryoshka embeddings shorten by truncation plus re-normalization.
+            return embedder.base_name, lambda matrix: normalize_rows(matrix[:, :dimensions])[0]
+        return None
+
+    def reproject_memories(self, memories: Sequence[Memory]) -> int:
+        """Re-project stored full-size vectors to the configured dimension.
+
+        Only memories whose stored vectors come from the source model and
+        still match the current chunking are converted, without calling the
+        embedding backend; returns how many were rewritten.
+        """
+
+        plan = self._reprojection()
+        if plan is None or not memories:
+            return 0
+        source, transform = plan
+        target = self._embedder_instance().name
+        records = {
+            record.memory_id: record
+            for record in self.embedding_repo.get_many([memory.id for memory in memories])
+            if record.embedding_model == source
+        }
+        vectors = self.embedding_repo.vectors(list(records.values()))
+        items = []
+        for memory in memories:
+            matrix = vectors.get(memory.id)
+            if matrix is None:
+                continue
+            text = self._compose_memory_text(memory)
+            chunk_texts, spans = self._chunk_memory(memory, text)
+            if matrix.shape[0] != len(chunk_texts):
+                continue
+            items.append((memory, text, transform(matrix), self._digest(target, text, spans), spans))
+        self._store_vectors(items, target)
+        return len(items)
+
+    def _chunk_memory(
+        self, memory: Memory, text: str
+    ) -> tuple[list[str], list[list[int]] | None]:
+        """Split a long memory into overlapping windows over its content.
+
+        Returns the texts to embed and their ``[start, end)`` spans in
+        ``memory.content``; short memories yield the composed text and None.
+        Every chunk repeats the title and tags so it can stand on its own.
+        """
+
+        size = self.settings.rag_chunk_size
+        overlap = min(max(self.settings.rag_chunk_overlap, 0), size // 2)
+        content = memory.content or ""
+        if size <= 0 or len(text) <= size or len(content) <= size:
+            return [text], None
+
+        header = memory.title or ""
+        footer = "Tags: " + ", ".join(memory.tags) if memory.tags else ""
+        spans: list[list[int]] = []
+        start = 0
+        while True:
+            end = min(start + size, len(content))
+            if end < len(content):
+                # Prefer to cut at whitespace in the second half of the window.
+                cut = max(
+                    content.rfind("\n", start + size // 2, end),
+                    content.rfind(" ", start + size // 2, end),
+                )
+                if cut > start:
+                    end = cut
+            spans.append([start, end])
+            if end >= len(content):
+                break
+            start = max(end - overlap, start + 1)
+            if not content[start - 1].isspace():
+                # Begin the overlap after a word boundary, not mid-word; with
+                # no whitespace in it the next chunk starts after the cut.
+                boundary = _WHITESPACE.search(content, start, end + 1)
+                if boundary is not None:
+                    start = boundary.end()
+
+        chunks = [
+            "\n\n".join(part for part in (header, content[start:end], footer) if part)
+            for start, end in spans
+        ]
+        return chunks, spans
+
+    def _store_vectors(
+        self,
+        items: Sequence[tuple[Memory, str, np.ndarray, str | None, list[list[int]] | None]],
+        model: str,
+    ) -> None:
+        dtype = self.settings.rag_vector_dtype
+        stored: list[tuple[Memory, str, np.ndarray]] = []
+        records = []
+        for memory, text, matrix, digest, spans in items:
+            if matrix.size == 0:
+                logger.debug("Empty embedding produced for memory %s", memory.id)
+                continue
+            stored.append((memory, text, matrix))
+            records.append(
+                {
+                    "memory_id": memory.id,
+                    "owner_id": memory.owner_id,
+                    "embedding_bytes": encode_for_storage(matrix, dtype).tobytes(),
+                    "embedding_dim": int(matrix.shape[1]),
+                    "embedding_dtype": dtype,
+                    "embedding_model": model,
+                    "content_hash": digest,
+                    "tags": memory.tags,
+                    "captured_at": memory.captured_at,
+                    "source_device": memory.source_device,
+                    "chunk_spans": spans,
+                    "chunk_content_hash": (
+                        self._span_source_hash(memory.content) if spans else None
+                    ),
+                }
+            )
+        if not records:
             return
 
-        self.embedding_repo.upsert(
-            memory_id=memory.id,
-            owner_id=memory.owner_id,
-            embedding_bytes=vector.tobytes(),
-            embedding_dim=int(vector.shape[0]),
-            embedding_dtype=vector.dtype.name,
-            embedding_model=embedder.name,
-        )
+        cache = get_vector_cache() if self.settings.rag_cache_enabled else None
+        # Fingerprints read before the write tell whether a cached entry was
+        # current; only then can the new rows be patched into it.
+        expected = {
+            owner_id: self.embedding_repo.owner_fingerprint(owner_id, model=model)
+            for owner_id in {memory.owner_id for memory, _, _ in stored}
+            if cache is not None and cache.contains(owner_id)
+        }
+        updated_at = self.embedding_repo.bulk_upsert(records)
+        if cache is not None:
+            for memory, text, matrix in stored:
+                if memory.owner_id not in expected:
+                    continue
+                expected[memory.owner_id] = cache.upsert(
+                    memory.owner_id,
+                    memory.id,
+                    matrix,
+                    model=model,
+                    expected=expected[memory.owner_id],
+                    updated_at=updated_at,
+                    text=text,
+                    filters=RowFilters(
+                        tags=tuple(memory.tags or ()),
+                        captured_at=memory.captured_at,
+                        source_device=memory.source_device,
+                    ),
+                )
 
-    def delete_memory_embedding(self, memory_id: uuid.UUID) -> None:
+    def delete_memory_embedding(
+        self, memory_id: uuid.UUID, owner_id: uuid.UUID | None = None
+    ) -> None:
         if not self.settings.rag_enabled:
             return
-        self.embedding_repo.delete(memory_id)
+        record = self.embedding_repo.get(memory_id)
+        cache = get_vector_cache() if self.settings.rag_cache_enabled else None
+        expected = None
+        if record is not None and cache is not None and cache.contains(record.owner_id):
+            expected = self.embedding_repo.owner_fingerprint(
+                record.owner_id, model=record.embedding_model
+            )
+        self.embedding_repo.delete(memory_id, owner_id=owner_id)
+        if expected is not None:
+            cache.discard(record.owner_id, memory_id, expected=expected)
+        elif cache is not None and owner_id is not None:
+            # No row to compare against; drop the entry rather than guess.
+            cache.invalidate(owner_id)
+
+    def _owner_vectors(self, owner_id: uuid.UUID, model: str) -> OwnerVectors:
+        """Return the owner's normalized vectors, served from cache when fresh."""
+
+        fingerprint = self.embedding_repo.owner_fingerprint(owner_id, model=model)
+        cache = get_vector_cache() if self.settings.rag_cache_enabled else None
+        if cache is not None:
+            entry = cache.get(owner_id, model=model, fingerprint=fingerprint)
+            if entry is not None:
+                return entry
+
+        vector_store = self.embedding_repo.vector_store
+        if vector_store is not None:
+            filter_rows = self.embedding_repo.filter_rows(owner_id, model=model)
+            ids, matrix, chunks = vector_store.load(owner_id, model=model)
+            # Skip vectors whose row never committed or was deleted since.
+            committed = {row[0] for row in filter_rows}
+            keep = np.fromiter((memory_id in committed for memory_id in ids), bool, len(ids))
+            if not keep.all():
+                ids = [memory_id for memory_id, kept in zip(ids, keep) if kept]
+                matrix, chunks = matrix[keep], chunks[keep]
+            entry = OwnerVectors.from_matrix(
+                ids,
+                matrix,
+                chunks=chunks,
+                model=model,
+                fingerprint=fingerprint,
+                dtype=self.settings.rag_vector_dtype,
+            )
+        else:
+            records = self.embedding_repo.list_by_owner(owner_id, model=model)
+            entry = OwnerVectors.from_records(
+                records,
+                model=model,
+                fingerprint=fingerprint,
+                dtype=self.settings.rag_vector_dtype,
+            )
+            filter_rows = [
+                (record.memory_id, record.tags, record.captured_at, record.source_device)
+                for record in records
+            ]
+        for memory_id, tags, captured_at, source_device in filter_rows:
+            entry.set_filters(
+                memory_id,
+                RowFilters(tuple(tags or ()), captured_at, source_device),
+            )
+        if cache is not None:
+            cache.put(owner_id, entry)
+        return entry
 
-    def search(  # noqa: C901 complexity acceptable for orchestrator
+    def search(
         self,
         query: str,
         *,
         owner_id: uuid.UUID,
         top_k: int | None = None,
+        filters: MemorySearchFilters | None = None,
+        query_vector: np.ndarray | None = None,
+        vectors: OwnerVectors | None = None,
     ) -> list[RAGResult]:
-        if not self.settings.rag_enabled:
-            return []
+        """Rank the owner's memories for ``query``.
 
-        records = self.embedding_repo.list_by_owner(owner_id)
-        if not records:
+        ``query_vector`` may carry a precomputed embedding (see
+        ``embed_query``/``aembed_query``) so the call makes no embedding
+        request, and ``vectors`` the result of ``owner_vectors``, which
+        lets callers load both concurrently.
+        """
+
+        if not self.settings.rag_enabled:
             return []
 
         embedder = self._embedder_instance()
-        query_vector = embedder.embed(query)
-        if query_vector.size == 0:
+        if vectors is None:
+            vectors = self._owner_vectors(owner_id, embedder.name)
+        if not vectors.size:
             return []
 
-        query_norm = np.linalg.norm(query_vector)
-        if query_norm == 0:
+        if query_vector is None:
+            query_vector = self._embed_query(embedder, query)
+        if query_vector.size == 0:
             return []
 
-        scored_ids: list[tuple[uuid.UUID, float]] = []
-        for record in records:
-            vector = np.frombuffer(
-                record.embedding,
-                dtype=np.dtype(record.embedding_dtype),
-            )
-            if vector.size == 0:
-                continue
-            vector_norm = np.linalg.norm(vector)
-            if vector_norm == 0:
-                continue
-            score = float(np.dot(query_vector, vector) / (query_norm * vector_norm))
-            scored_ids.append((record.memory_id, score))
-
-        scored_ids.sort(key=lambda item: item[1], reverse=True)
         limit = top_k or self.settings.rag_default_top_k
-        selected = scored_ids[:limit]
-
-        results: list[RAGResult] = []
+        use_ivf = self.settings.rag_index_type == "ivf"
+        hybrid = self.settings.rag_retrieval_mode == "hybrid"
+        keywords = vectors.keywords
+        if hybrid and keywords is None:
+            keywords = self._build_keywords(owner_id, vectors)
+        fused_scores: dict[uuid.UUID, float] = {}
+        with vectors.lock:
+            mask = (
+                vectors.filter_mask(
+                    tags=filters.tags,
+                    captured_from=filters.captured_from,
+                    captured_to=filters.captured_to,
+                    source_device=filters.source_device,
+                )
+                if filters is not None
+                else None
+            )
+            if mask is not None and not mask.any():
+                return []
+            if use_ivf:
+                vectors.ensure_ivf(
+                    min_size=self.settings.rag_ann_min_size,
+                    nlist=self.settings.rag_ivf_nlist,
+                )
+            if not hybrid:
+                vector_hits = vectors.top_k(
+                    query_vector,
+                    limit,
+                    nprobe=self.settings.rag_ivf_nprobe if use_ivf else None,
+                    mask=mask,
+                    rerank=self.settings.rag_rerank_candidates,
+                )
+                selected = [(memory_id, score) for memory_id, score, _ in vector_hits]
+            else:
+                depth = max(limit, self.settings.rag_hybrid_candidates)
+                keyword_hits = keywords.top_k(
+                    query,
+                    depth,
+                    allowed=(
+                        {vectors.ids[row] for row in np.flatnonzero(mask)}
+                        if mask is not None
+                        else None
+                    ),
+                )
+                # On large corpora the keyword hits double as the candidate
+                # set, so only a few hundred vectors are scored.
+                prefilter = (
+                    vectors.size >= self.settings.rag_hybrid_prefilter_min
+                    and len(keyword_hits) >= limit
+                )
+                vector_hits = vectors.top_k(
+                    query_vector,
+                    depth,
+                    nprobe=self.settings.rag_ivf_nprobe if use_ivf else None,
+                    candidates=(
+                        [memory_id for memory_id, _ in keyword_hits] if prefilter else None
+                    ),
+                    mask=mask,
+                    rerank=self.settings.rag_rerank_candidates,
+                )
+                fused = _reciprocal_rank_fusion(
+                    [keyword_hits, [(memory_id, score) for memory_id, score, _ in vector_hits]],
+                    k=self.settings.rag_rrf_k,
+                )[:limit]
+                # Keyword-only hits still get a cosine score (and best chunk).
+                scored = {memory_id for memory_id, _, _ in vector_hits}
+                unscored = [memory_id for memory_id, _ in fused if memory_id not in scored]
+                if unscored:
+                    vector_hits = vector_hits + vectors.top_k(
+                        query_vector,
+                        len(unscored),
+                        candidates=unscored,
+                        rerank=self.settings.rag_rerank_candidates,
+                    )
+                fused_scores = dict(fused)
+                cosine = {memory_id: score for memory_id, score, _ in vector_hits}
+                selected = [(memory_id, cosine.get(memory_id, 0.0)) for memory_id, _ in fused]
+
+        selected_ids = [memory_id for memory_id, _ in selected]
+        memories = self.memory_repo.get_many(selected_ids)
+        memory_map = {memory.id: memory for memory in memories}
+        best_chunk = {memory_id: chunk for memory_id, _, chunk in vector_hits}
+        spans = self.embedding_repo.chunk_spans(selected_ids)
+        results = []
         for memory_id, score in selected:
-            memory = self.memory_repo.get(memory_id)
+            memory = memory_map.get(memory_id)
             if memory is None:
                 continue
-            results.append(RAGResult(memory=memory, score=score))
-
+            chunk = None
+            memory_spans, source_hash = spans.get(memory_id, (None, None))
+            index = best_chunk.get(memory_id)
+            # Spans index the content at embedding time; after an edit not yet
+            # reindexed they would slice the wrong text, so use the whole memory.
+            if (
+                memory_spans
+                and index is not None
+                and index < len(memory_spans)
+                and source_hash == self._span_source_hash(memory.content)
+            ):
+                start, end = memory_spans[index]
+                chunk = memory.content[start:end]
+            results.append(
+                RAGResult(
+                    memory=memory,
+                    score=score,
+                    chunk=chunk,
+                    fused_score=fused_scores.get(memory_id),
+                )
+            )
         return results
 
+    def _query_cache_key(self, embedder: EmbeddingBackend, query: str) -> str | None:
+        if not self.settings.rag_query_cache_enabled or isinstance(
+            getattr(embedder, "base", embedder), LocalHashEmbeddingBackend
+        ):
+            return None
+        return query_key(embedder.name, query)
+
+    def _embed_query(self, embedder: EmbeddingBackend, query: str) -> np.ndarray:
+        """Embed a search query, reusing recent embeddings of the same text."""
+
+        key = self._query_cache_key(embedder, query)
+        vector = get_query_embedding_cache().get(key) if key else None
+        if vector is None:
+            vector = embedder.embed(query)
+            if key and vector.size > 1:
+                get_query_embedding_cache().put(key, vector)
+        return vector
+
+    def owner_vectors(self, owner_id: uuid.UUID) -> OwnerVectors:
+        """The owner's vectors for the current embedder, for ``search(vectors=...)``."""
+
+        return self._owner_vectors(owner_id, self._embedder_instance().name)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Query embedding for ``search(query_vector=...)``; uses no session."""
+
+        return self._embed_query(self._embedder_instance(), query)
+
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """Async query embedding for ``search(query_vector=...)``.
+
+        Building the embedder and the query cache's SQLite lookups and
+        writes run in a worker thread so they never block the event loop.
+        """
+
+        embedder = self._embedder or await asyncio.to_thread(self._embedder_instance)
+        key = self._query_cache_key(embedder, query)
+        cache = await asyncio.to_thread(get_query_embedding_cache)
+        vector = await asyncio.to_thread(cache.get, key) if key else None
+        if vector is None:
+            native = getattr(embedder, "aembed", None)
+            if native is not None:
+                vector = await native(query)
+            else:
+                vector = await asyncio.to_thread(embedder.embed, query)
+            if key and vector.size > 1:
+                await asyncio.to_thread(cache.put, key, vector)
+        return vector
+
+    def _build_keywords(self, owner_id: uuid.UUID, vectors: OwnerVectors) -> OwnerKeywords:
+        """Index the texts of the owner's embedded memories for BM25.
+
+        Runs outside ``vectors.lock`` from column-only rows, and attaches the
+        index only if no upsert touched the entry meanwhile (those skip the
+        keyword update while it is unset); otherwise it serves this query and
+        the next search rebuilds it.
+        """
+
+        with vectors.lock:
+            fingerprint = vectors.fingerprint
+            embedded = set(vectors.rows)
+        keywords = OwnerKeywords.from_documents(
+            (
+                (row.id, self._compose_memory_text(row))
+                for row in self.memory_repo.list_texts_by_owner(owner_id)
+                if row.id in embedded
+            ),
+            char_ngram=self.settings.rag_local_char_ngram,
+        )
+        with vectors.lock:
+            if vectors.keywords is None and vectors.fingerprint == fingerprint:
+                vectors.keywords = keywords
+        return keywords
+
     @staticmethod
-    def _compose_memory_text(memory: Memory) -> str:
+    def _compose_memory_text(memory: Memory | Row) -> str:
         parts = [memory.title or "", memory.content or ""]
         if memory.tags:
             parts.append("Tags: " + ", ".join(memory.tags))
@@ -9,6 +9,7 @@ from typing import Any
 from openai import OpenAI
 
 from app.config import get_settings
+from app.services.openai_clients import get_async_openai_client, get_openai_client
 
 
 class TranscriptionError(RuntimeError):
@@ -31,16 +32,13 @@ class TranscriptionService:
 
     def __init__(self) -> None:
         self.settings = get_settings()
-        self._client: OpenAI | None = None
 
     def _client_instance(self) -> OpenAI:
         if not self.settings.openai_api_key:
             raise TranscriptionNotConfigured(
                 "OpenAI API key is required for audio transcription."
             )
-        if self._client is None:
-            self._client = OpenAI(api_key=self.settings.openai_api_key)
-        return self._client
+        return get_openai_client()
 
     def transcribe_audio(
         self,
@@ -49,13 +47,8 @@ class TranscriptionService:
         filename: str | None = None,
         content_type: str | None = None,
     ) -> TranscriptionResult:
-        if not audio_bytes:
-            raise TranscriptionError("Audio payload is empty.")
-
+        buffer = self._buffer(audio_bytes, filename)
         client = self._client_instance()
-        buffer = BytesIO(audio_bytes)
-        buffer.name = filename or "audio-input"
-
         try:
             response = client.audio.transcriptions.create(
                 model=self.settings.openai_transcription_model,
@@ -65,7 +58,42 @@ class TranscriptionService:
             )
         except Exception as exc:  # noqa: BLE001
             raise TranscriptionError(f"Transcription request failed: {exc}") from exc
+        return self._result(response)
+
+    async def atranscribe_audio(
+        self,
+        audio_bytes: bytes,
+        *,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> TranscriptionResult:
+        """Async ``transcribe_audio`` using the shared ``AsyncOpenAI`` client."""
+
+        buffer = self._buffer(audio_bytes, filename)
+        if not self.settings.openai_api_key:
+            raise TranscriptionNotConfigured(
+                "OpenAI API key is required for audio transcription."
+            )
+        try:
+            response = await get_async_openai_client().audio.transcriptions.create(
+                model=self.settings.openai_transcription_model,
+                file=buffer,
+                response_format="json",
+                temperature=0,
+            )
+        except Exception as exc:  # noqa: BLE001
+            raise TranscriptionError(f"Transcription request failed: {exc}") from exc
+        return self._result(response)
+
+    @staticmethod
+    def _buffer(audio_bytes: bytes, filename: str | None) -> BytesIO:
+        if not audio_bytes:
+            raise TranscriptionError("Audio payload is empty.")
+        buffer = BytesIO(audio_bytes)
+        buffer.name = filename or "audio-input"
+        return buffer
 
+    def _result(self, response: Any) -> TranscriptionResult:
         text = self._extract_text(response)
         if not text:
             raise TranscriptionError("Transcription completed but returned empty text.")
@@ -0,0 +1,721 @@
+"""Process-wide cache of per-owner embedding matrices for RAG search."""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from app.config import get_settings
+from app.models import MemoryEmbedding
+from app.services import ann_index
+from app.services.quantization import normalize_rows, quantize_rows
+
+if TYPE_CHECKING:
+    from app.services.keyword_index import OwnerKeywords
+
+# (row count, latest updated_at) of an owner's embeddings for one model.
+Fingerprint = tuple[int, datetime | None]
+
+_ID_OVERHEAD_BYTES = 128  # rough cost of a UUID in the id list and row map
+_SCORE_BLOCK_ROWS = 8192  # rows upcast to float32 at a time when scoring
+
+
+@dataclass(frozen=True, slots=True)
+class RowFilters:
+    """Filterable attributes of a memory, denormalized onto its embedding."""
+
+    tags: tuple[str, ...] = ()
+    captured_at: datetime | None = None
+    source_device: str | None = None
+
+
+def _timestamp(value: datetime | None) -> float:
+    if value is None:
+        return float("nan")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class OwnerVectors:
+    """Contiguous matrix of unit-normalized vectors for a single owner.
+
+    Long memories are embedded as several chunks, so a memory owns one or
+    more rows; ``ids`` and ``chunks`` are parallel to the first ``size`` rows
+    and ``rows`` maps a memory to its row indices. Searches score rows and
+    keep each memory's best chunk (max-sim). Rows are kept in a buffer with
+    spare capacity so incremental inserts do not copy the whole matrix.
+    Zero-norm vectors occupy a row but are masked out through ``valid``.
+    An optional IVF index stores one inverted-list label per row in a second
+    parallel array, so incremental updates keep it in sync in O(1). A BM25
+    ``keywords`` index for hybrid search may be attached and shares the
+    entry's lifetime, lock and fingerprint.
+
+    Search filters are kept as parallel arrays too: capture time as epoch
+    seconds (NaN when unknown), source device as an integer code, and tags as
+    a tag -> memory ids map, so a filter becomes a boolean row mask applied
+    before scoring.
+
+    Rows may be held as float16 or int8 (``dtype``) with a float32 scale per
+    row. Reduced-precision rows are scored block by block against a query
+    quantized the same way, and the best ``rerank`` rows are then re-scored
+    with the float32 query.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        fingerprint: Fingerprint,
+        ids: list[uuid.UUID],
+        matrix: np.ndarray,
+        valid: np.ndarray,
+        chunks: np.ndarray | None = None,
+        scales: np.ndarray | None = None,
+    ):
+        self.model = model
+        self.fingerprint = fingerprint
+        self.ids = ids
+        self.rows: dict[uuid.UUID, list[int]] = {}
+        for row, memory_id in enumerate(ids):
+            self.rows.setdefault(memory_id, []).append(row)
+        if chunks is None:
+            chunks = np.zeros(matrix.shape[0], dtype=np.int32)
+            for memory_rows in self.rows.values():
+                chunks[memory_rows] = np.arange(len(memory_rows))
+        self._chunks = np.asarray(chunks, dtype=np.int32)
+        self._matrix = matrix
+        self._valid = valid
+        self._scales = (
+            np.ones(matrix.shape[0], dtype=np.float32) if scales is None else scales
+        )
+        self._captured = np.full(matrix.shape[0], np.nan)
+        self._devices = np.full(matrix.shape[0], -1, dtype=np.int32)
+        self._device_codes: dict[str, int] = {}
+        self._tag_members: dict[str, set[uuid.UUID]] = {}
+        self._row_tags: dict[uuid.UUID, tuple[str, ...]] = {}
+        self._centroids: np.ndarray | None = None
+        self._lists: np.ndarray | None = None
+        self._indexed_size = 0
+        self.keywords: OwnerKeywords | None = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[MemoryEmbedding],
+        *,
+        model: str,
+        fingerprint: Fingerprint,
+        dtype: str = "float32",
+    ) -> "OwnerVectors":
+        records = [record for record in records if record.embedding]
+        if not records:
+            return cls.empty(model=model, fingerprint=fingerprint, dtype=dtype)
+
+        # Rows of the dominant dimension are decoded with one buffer read per
+        # stored dtype (float32 rows written before switching to int8 stay
+        # usable); records of any other shape are stale and kept as one
+        # masked row.
+        dim, _ = Counter(record.embedding_dim for record in records).most_common(1)[0]
+        if not dim:
+            return cls.empty(model=model, fingerprint=fingerprint, dtype=dtype)
+
+        counts: list[int] = []
+        usable_records: list[bool] = []
+        groups: dict[str, list[int]] = {}
+        for index, record in enumerate(records):
+            row_bytes = dim * np.dtype(record.embedding_dtype).itemsize
+            ok = record.embedding_dim == dim and len(record.embedding) % row_bytes == 0
+            usable_records.append(ok)
+            counts.append(len(record.embedding) // row_bytes if ok else 1)
+            if ok:
+                groups.setdefault(record.embedding_dtype, []).append(index)
+
+        repeats = np.asarray(counts)
+        starts = np.cumsum(repeats) - repeats
+        matrix: np.ndarray = np.zeros((int(repeats.sum()), dim), dtype=np.float32)
+        for dtype_name, indexes in groups.items():
+            block = np.frombuffer(
+                b"".join(records[index].embedding for index in indexes),
+                dtype=np.dtype(dtype_name),
+            ).reshape(-1, dim)
+            if len(indexes) == len(records):
+                matrix = block
+                break
+            target = np.concatenate(
+                [np.arange(starts[index], starts[index] + counts[index]) for index in indexes]
+            )
+            matrix[target] = block
+        return cls.from_matrix(
+            [record.memory_id for record, count in zip(records, counts) for _ in range(count)],
+            matrix,
+            chunks=np.arange(matrix.shape[0]) - np.repeat(starts, repeats),
+            usable=np.repeat(np.asarray(usable_records), repeats),
+            model=model,
+            fingerprint=fingerprint,
+            dtype=dtype,
+        )
+
+    @classmethod
+    def from_matrix(
+        cls,
+        ids: list[uuid.UUID],
+        matrix: np.ndarray,
+        *,
+        model: str,
+        fingerprint: Fingerprint,
+        chunks: np.ndarray | None = None,
+        usable: np.ndarray | None = None,
+        dtype: str = "float32",
+    ) -> "OwnerVectors":
+        """Normalize a raw (rows x dim) matrix into a new entry.
+
+        ``ids`` holds the memory of each row; without ``chunks`` a memory's
+        rows are numbered in order of appearance. Rows are kept as ``dtype``.
+        """
+
+        if not ids:
+            return cls.empty(model=model, fingerprint=fingerprint, dtype=dtype)
+        matrix, valid = normalize_rows(matrix)
+        if usable is not None:
+            valid &= usable
+        matrix, scales = quantize_rows(matrix, dtype)
+        return cls(
+            model=model,
+            fingerprint=fingerprint,
+            ids=list(ids),
+            matrix=matrix,
+            valid=valid,
+            chunks=chunks,
+            scales=scales,
+        )
+
+    @classmethod
+    def empty(
+        cls, *, model: str, fingerprint: Fingerprint, dtype: str = "float32"
+    ) -> "OwnerVectors":
+        return cls(
+            model=model,
+            fingerprint=fingerprint,
+            ids=[],
+            matrix=np.zeros((0, 0), dtype=np.dtype(dtype)),
+            valid=np.zeros(0, dtype=bool),
+        )
+
+    @property
+    def size(self) -> int:
+        """Number of rows (chunks), not memories."""
+
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return int(self._matrix.shape[1])
+
+    @property
+    def dtype(self) -> str:
+        return self._matrix.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        total = (
+            self._matrix.nbytes
+            + self._scales.nbytes
+            + self._valid.nbytes
+            + self._chunks.nbytes
+            + self._captured.nbytes
+            + self._devices.nbytes
+            + (len(self.ids) + len(self._row_tags)) * _ID_OVERHEAD_BYTES
+        )
+        if self._centroids is not None and self._lists is not None:
+            total += self._centroids.nbytes + self._lists.nbytes
+        if self.keywords is not None:
+            total += self.keywords.nbytes
+        return total
+
+    @property
+    def has_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def ensure_ivf(self, *, min_size: int, nlist: int | None = None) -> None:
+        """Build, rebuild or drop the IVF index according to the current size.
+
+        The index is dropped below ``min_size`` and retrained once the owner
+        has doubled since the last training run, so centroids track drift.
+        """
+
+        if self.size < max(min_size, 1):
+            self._centroids = None
+            self._lists = None
+            self._indexed_size = 0
+            return
+        if self._centroids is not None and self.size <= 2 * self._indexed_size:
+            return
+
+        matrix = self._dense(slice(0, self.size))
+        trainable = matrix[self._valid[: self.size]]
+        if not trainable.shape[0]:
+            return
+        centroids = ann_index.train_centroids(
+            trainable,
+            nlist or ann_index.default_nlist(trainable.shape[0]),
+        )
+        lists = np.full(self._matrix.shape[0], -1, dtype=np.int32)
+        lists[: self.size] = ann_index.assign_lists(matrix, centroids)
+        self._centroids = centroids
+        self._lists = lists
+        self._indexed_size = self.size
+
+    def _ensure_capacity(self, rows: int, dim: int) -> None:
+        capacity = self._matrix.shape[0]
+        if rows <= capacity and dim == self.dim:
+            return
+        new_capacity = max(rows, 16, capacity * 2)
+        matrix = np.zeros((new_capacity, dim), dtype=self._matrix.dtype)
+        valid = np.zeros(new_capacity, dtype=bool)
+        scales = np.ones(new_capacity, dtype=np.float32)
+        if self.size:
+            matrix[: self.size] = self._matrix[: self.size]
+            valid[: self.size] = self._valid[: self.size]
+            scales[: self.size] = self._scales[: self.size]
+        self._matrix = matrix
+        self._valid = valid
+        self._scales = scales
+        chunks = np.zeros(new_capacity, dtype=np.int32)
+        captured = np.full(new_capacity, np.nan)
+        devices = np.full(new_capacity, -1, dtype=np.int32)
+        chunks[: self.size] = self._chunks[: self.size]
+        captured[: self.size] = self._captured[: self.size]
+        devices[: self.size] = self._devices[: self.size]
+        self._chunks = chunks
+        self._captured = captured
+        self._devices = devices
+        if self._lists is not None:
+            lists = np.full(new_capacity, -1, dtype=np.int32)
+            lists[: self.size] = self._lists[: self.size]
+            self._lists = lists
+
+    def upsert(self, memory_id: uuid.UUID, vectors: np.ndarray) -> bool:
+        """Insert or replace a memory's chunk rows; False if they do not fit."""
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors = vectors.reshape(-1, vectors.shape[-1])
+        if self.size and vectors.shape[1] != self.dim:
+            return False
+
+        memory_rows = self.rows.get(memory_id)
+        if memory_rows is None or len(memory_rows) != vectors.shape[0]:
+            if memory_rows is not None:
+                self.discard(memory_id)
+            start = self.size
+            self._ensure_capacity(start + vectors.shape[0], vectors.shape[1])
+            memory_rows = list(range(start, start + vectors.shape[0]))
+            self.ids.extend([memory_id] * len(memory_rows))
+            self.rows[memory_id] = memory_rows
+            self._chunks[memory_rows] = np.arange(len(memory_rows))
+
+        unit_rows, valid = normalize_rows(vectors)
+        self._valid[memory_rows] = valid
+        self._matrix[memory_rows], self._scales[memory_rows] = quantize_rows(
+            unit_rows, self.dtype
+        )
+        if self._centroids is not None and self._lists is not None:
+            self._lists[memory_rows] = ann_index.assign_lists(unit_rows, self._centroids)
+        return True
+
+    def _remove_row(self, row: int) -> None:
+        last = self.size - 1
+        if row != last:
+            moved_id = self.ids[last]
+            moved_rows = self.rows[moved_id]
+            moved_rows[moved_rows.index(last)] = row
+            self.ids[row] = moved_id
+            self._matrix[row] = self._matrix[last]
+            self._valid[row] = self._valid[last]
+            self._scales[row] = self._scales[last]
+            self._chunks[row] = self._chunks[last]
+            self._captured[row] = self._captured[last]
+            self._devices[row] = self._devices[last]
+            if self._lists is not None:
+                self._lists[row] = self._lists[last]
+        self.ids.pop()
+        self._valid[last] = False
+        self._captured[last] = np.nan
+        self._devices[last] = -1
+
+    def discard(self, memory_id: uuid.UUID) -> bool:
+        """Remove a memory's rows, moving trailing rows into the freed slots."""
+
+        memory_rows = self.rows.pop(memory_id, None)
+        if memory_rows is None:
+            return False
+        # Descending order guarantees the moved last row is never our own.
+        for row in sorted(memory_rows, reverse=True):
+            self._remove_row(row)
+        self._set_tags(memory_id, ())
+        return True
+
+    def _set_tags(self, memory_id: uuid.UUID, tags: tuple[str, ...]) -> None:
+        for tag in self._row_tags.pop(memory_id, ()):
+            members = self._tag_members[tag]
+            members.discard(memory_id)
+            if not members:
+                del self._tag_members[tag]
+        if tags:
+            self._row_tags[memory_id] = tags
+            for tag in tags:
+                self._tag_members.setdefault(tag, set()).add(memory_id)
+
+    def set_filters(self, memory_id: uuid.UUID, filters: RowFilters) -> None:
+        memory_rows = self.rows.get(memory_id)
+        if memory_rows is None:
+            return
+        self._captured[memory_rows] = _timestamp(filters.captured_at)
+        if filters.source_device is None:
+            self._devices[memory_rows] = -1
+        else:
+            self._devices[memory_rows] = self._device_codes.setdefault(
+                filters.source_device, len(self._device_codes)
+            )
+        self._set_tags(memory_id, filters.tags)
+
+    def filter_mask(
+        self,
+        *,
+        tags: Iterable[str] | None = None,
+        captured_from: datetime | None = None,
+        captured_to: datetime | None = None,
+        source_device: str | None = None,
+    ) -> np.ndarray | None:
+        """Boolean mask over rows matching every given filter; None if unfiltered.
+
+        ``tags`` matches rows carrying any of the tags; the capture range is
+        inclusive and excludes rows without a capture time.
+        """
+
+        size = self.size
+        mask: np.ndarray | None = None
+        if tags:
+            mask = np.zeros(size, dtype=bool)
+            members: set[uuid.UUID] = set()
+            for tag in tags:
+                members |= self._tag_members.get(tag, set())
+            rows = [
+                row
+                for memory_id in members
+                for row in self.rows.get(memory_id, ())
+            ]
+            mask[rows] = True
+        if captured_from is not None or captured_to is not None:
+            captured = self._captured[:size]
+            in_range = ~np.isnan(captured)
+            if captured_from is not None:
+                in_range &= captured >= _timestamp(captured_from)
+            if captured_to is not None:
+                in_range &= captured <= _timestamp(captured_to)
+            mask = in_range if mask is None else mask & in_range
+        if source_device is not None:
+            code = self._device_codes.get(source_device)
+            on_device = (
+                self._devices[:size] == code
+                if code is not None
+                else np.zeros(size, dtype=bool)
+            )
+            mask = on_device if mask is None else mask & on_device
+        return mask
+
+    def _dense(self, rows: np.ndarray | slice) -> np.ndarray:
+        """Dequantized float32 unit vectors of ``rows``."""
+
+        values = self._matrix[rows]
+        if values.dtype == np.float32:
+            return values
+        return values.astype(np.float32) * self._scales[rows][:, None]
+
+    def _score(
+        self,
+        rows: np.ndarray | None,
+        query: np.ndarray,
+        *,
+        rerank: int = 0,
+        allowed: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Cosine scores of ``rows`` (all rows if None) for a unit query.
+
+        Scores are -inf where ``allowed`` is False.
+        """
+
+        selection = slice(0, self.size) if rows is None else rows
+        values = self._matrix[selection]
+        if values.dtype == np.float32:
+            scores = values @ query
+            return scores if allowed is None else np.where(allowed, scores, -np.inf)
+
+        coarse_query, query_scale = quantize_rows(query[None, :], self.dtype)
+        coarse_query = coarse_query[0].astype(np.float32)
+        scores = np.empty(values.shape[0], dtype=np.float32)
+        for start in range(0, values.shape[0], _SCORE_BLOCK_ROWS):
+            block = values[start : start + _SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[start : start + _SCORE_BLOCK_ROWS] = block @ coarse_query
+        scores *= self._scales[selection] * query_scale[0]
+        if allowed is not None:
+            scores = np.where(allowed, scores, -np.inf)
+        if rerank > 0:
+            best = select_top_k(scores, rerank)
+            scores[best] = self._dense(best if rows is None else rows[best]) @ query
+        return scores
+
+    def _best_per_memory(
+        self, rows: np.ndarray, scores: np.ndarray, k: int
+    ) -> list[tuple[uuid.UUID, float, int]]:
+        """Reduce row scores to each memory's best chunk, ``k`` memories max."""
+
+        depth = k
+        while True:
+            order = select_top_k(scores, depth)
+            results: list[tuple[uuid.UUID, float, int]] = []
+            seen: set[uuid.UUID] = set()
+            for index in order:
+                row = int(rows[index])
+                memory_id = self.ids[row]
+                if memory_id in seen:
+                    continue
+                seen.add(memory_id)
+                results.append((memory_id, float(scores[index]), int(self._chunks[row])))
+                if len(results) == k:
+                    return results
+            if order.size < depth:
+                return results
+            depth *= 4
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        *,
+        nprobe: int | None = None,
+        candidates: Iterable[uuid.UUID] | None = None,
+        mask: np.ndarray | None = None,
+        rerank: int = 0,
+    ) -> list[tuple[uuid.UUID, float, int]]:
+        """Return the ``k`` best (memory_id, cosine score, chunk) for a query.
+
+        Each memory is scored by its best matching chunk. Rows outside
+        ``mask`` (see ``filter_mask``) are never scored. With ``candidates``
+        only those memories are scored. Otherwise, when an IVF index is built
+        and ``nprobe`` is given, only rows in the ``nprobe`` closest inverted
+        lists are scored. For reduced-precision rows, ``rerank`` > 0 re-scores
+        that many of the best rows (at least ``k``) with the float32 query.
+        """
+
+        if not self.size or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if query.size != self.dim:
+            return []
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0:
+            return []
+
+        query = query / query_norm
+        if rerank > 0:
+            rerank = max(rerank, k)
+        allowed = self._valid[: self.size]
+        if mask is not None:
+            allowed = allowed & mask
+
+        if candidates is not None:
+            rows = np.fromiter(
+                (
+                    row
+                    for memory_id in candidates
+                    for row in self.rows.get(memory_id, ())
+                ),
+                dtype=np.int64,
+            )
+            rows = rows[allowed[rows]]
+            return self._best_per_memory(rows, self._score(rows, query, rerank=rerank), k)
+
+        if nprobe and self._centroids is not None and self._lists is not None:
+            probed = ann_index.probe_lists(query, self._centroids, nprobe)
+            rows = np.flatnonzero(
+                np.isin(self._lists[: self.size], probed) & allowed
+            )
+            if rows.size >= k:
+                selected = self._best_per_memory(
+                    rows, self._score(rows, query, rerank=rerank), k
+                )
+                if len(selected) == k:
+                    return selected
+
+        if mask is not None:
+            # Filtered searches score only the surviving rows.
+            rows = np.flatnonzero(allowed)
+            return self._best_per_memory(rows, self._score(rows, query, rerank=rerank), k)
+
+        scores = self._score(None, query, rerank=rerank, allowed=allowed)
+        return self._best_per_memory(np.arange(self.size), scores, k)
+
+
+def select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the ``k`` highest finite scores, best first.
+
+    Uses ``argpartition`` so only the selected slice is sorted.
+    """
+
+    candidates = np.flatnonzero(np.isfinite(scores))
+    if candidates.size > k:
+        part = np.argpartition(scores[candidates], -k)[-k:]
+        candidates = candidates[part]
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+class VectorCache:
+    """LRU cache of ``OwnerVectors`` bounded by an approximate byte budget.
+
+    Entries are tagged with a fingerprint of the owner's embedding rows so a
+    change written by another worker process triggers a reload on next use.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[uuid.UUID, OwnerVectors] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(
+        self,
+        owner_id: uuid.UUID,
+        *,
+        model: str,
+        fingerprint: Fingerprint,
+    ) -> OwnerVectors | None:
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None:
+                return None
+            if entry.model != model or entry.fingerprint != fingerprint:
+                del self._entries[owner_id]
+                return None
+            self._entries.move_to_end(owner_id)
+            return entry
+
+    def put(self, owner_id: uuid.UUID, entry: OwnerVectors) -> None:
+        with self._lock:
+            self._entries[owner_id] = entry
+            self._entries.move_to_end(owner_id)
+            self._evict()
+
+    def contains(self, owner_id: uuid.UUID) -> bool:
+        with self._lock:
+            return owner_id in self._entries
+
+    def upsert(
+        self,
+        owner_id: uuid.UUID,
+        memory_id: uuid.UUID,
+        vectors: np.ndarray,
+        *,
+        model: str,
+        expected: Fingerprint,
+        updated_at: datetime | None,
+        text: str | None = None,
+        filters: RowFilters | None = None,
+    ) -> Fingerprint | None:
+        """Apply a freshly persisted embedding (one row per chunk) to a loaded entry.
+
+        ``expected`` is the owner's fingerprint read before the write; if the
+        entry no longer matches it (another process wrote in between) the
+        entry is dropped and reloaded on next use instead. ``text`` keeps an
+        attached keyword index in sync; without it the keyword index is
+        dropped and rebuilt on next use. Returns the entry's new fingerprint,
+        or None when nothing is cached for the owner anymore.
+        """
+
+        with self._lock:
+            entry = self._entries.get(owner_id)
+        if entry is None:
+            return None
+        if entry.model != model:
+            self.invalidate(owner_id)
+            return None
+
+        with entry.lock:
+            is_new = memory_id not in entry.rows
+            if entry.fingerprint != expected or not entry.upsert(memory_id, vectors):
+                applied = False
+            else:
+                applied = True
+                entry.set_filters(memory_id, filters or RowFilters())
+                if entry.keywords is not None:
+                    if text is None:
+                        entry.keywords = None
+                    else:
+                        entry.keywords.upsert(memory_id, text)
+                count, latest = entry.fingerprint
+                if updated_at is not None and (latest is None or updated_at > latest):
+                    latest = updated_at
+                entry.fingerprint = (count + int(is_new), latest)
+            fingerprint = entry.fingerprint
+
+        if not applied:
+            self.invalidate(owner_id)
+            return None
+        with self._lock:
+            self._evict()
+        return fingerprint
+
+    def discard(
+        self, owner_id: uuid.UUID, memory_id: uuid.UUID, *, expected: Fingerprint
+    ) -> None:
+        """Drop a deleted memory's vectors from the owner's loaded entry.
+
+        As with ``upsert``, ``expected`` is the fingerprint read before the
+        delete; a mismatch drops the whole entry.
+        """
+
+        with self._lock:
+            entry = self._entries.get(owner_id)
+        if entry is None:
+            return
+        with entry.lock:
+            if entry.fingerprint == expected and entry.discard(memory_id):
+                if entry.keywords is not None:
+                    entry.keywords.discard(memory_id)
+                count, latest = entry.fingerprint
+                entry.fingerprint = (count - 1, latest)
+                return
+            stale = entry.fingerprint != expected
+        if stale:
+            self.invalidate(owner_id)
+
+    def invalidate(self, owner_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(owner_id, None)
+
+    def _evict(self) -> None:
+        total = sum(entry.nbytes for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+        if total > self.max_bytes and self._entries:
+            self._entries.clear()
+
+
+@lru_cache()
+def get_vector_cache() -> VectorCache:
+    """Return the process-wide vector cache."""
+
+    return VectorCache(max_bytes=get_settings().rag_cache_max_bytes)
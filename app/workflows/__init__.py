@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from .engine import Workflow, WorkflowContext, WorkflowEngine
+from .engine import DeferredWorkflowQueue, Workflow, WorkflowContext, WorkflowEngine
+from .outbox import OutboxDispatcher
 
 workflow_engine = WorkflowEngine()
 _initialized = False
@@ -22,6 +23,8 @@ def initialize_workflows() -> None:
 
 
 __all__ = [
+    "DeferredWorkflowQueue",
+    "OutboxDispatcher",
     "WorkflowEngine",
     "WorkflowContext",
     "Workflow",
@@ -5,7 +5,9 @@ from __future__ import annotations
 import logging
 import uuid
 
+from app.config import get_settings
 from app.repositories import MemoryRepository
+from app.services.completion_cache import get_completion_cache
 from app.services.rag_service import RAGService
 
 from .engine import Workflow, WorkflowContext, WorkflowEngine
@@ -27,6 +29,13 @@ def _extract_memory_id(context: WorkflowContext) -> uuid.UUID | None:
         return None
 
 
+def _memory_key(payload: dict) -> tuple[str, str] | None:
+    # Index and delete runs for one memory share a key, so queued runs
+    # collapse into the latest event and never race each other.
+    raw_id = payload.get("memory_id")
+    return ("memory", str(raw_id)) if raw_id is not None else None
+
+
 def _index_memory_step(context: WorkflowContext) -> None:
     memory_id = _extract_memory_id(context)
     if memory_id is None:
@@ -44,8 +53,23 @@ def _delete_embedding_step(context: WorkflowContext) -> None:
     memory_id = _extract_memory_id(context)
     if memory_id is None:
         return
+    owner_id = context.payload.get("owner_id")
     rag = RAGService(context.session)
-    rag.delete_memory_embedding(memory_id)
+    rag.delete_memory_embedding(
+        memory_id,
+        owner_id=uuid.UUID(str(owner_id)) if owner_id else None,
+    )
+
+
+def _invalidate_completions_step(context: WorkflowContext) -> None:
+    if not get_settings().assistant_completion_cache_enabled:
+        return
+    memory_id = _extract_memory_id(context)
+    if memory_id is None:
+        return
+    dropped = get_completion_cache().invalidate(memory_id)
+    if dropped:
+        logger.debug("Dropped %d cached completions using memory %s", dropped, memory_id)
 
 
 def register_default_workflows(engine: WorkflowEngine) -> None:
@@ -56,6 +80,8 @@ def register_default_workflows(engine: WorkflowEngine) -> None:
             name="memory-index-on-create",
             event="memory.created",
             steps=[_index_memory_step],
+            deferred=True,
+            coalesce_key=_memory_key,
         )
     )
 
@@ -64,6 +90,8 @@ def register_default_workflows(engine: WorkflowEngine) -> None:
             name="memory-reindex-on-update",
             event="memory.updated",
             steps=[_index_memory_step],
+            deferred=True,
+            coalesce_key=_memory_key,
         )
     )
 
@@ -72,6 +100,18 @@ def register_default_workflows(engine: WorkflowEngine) -> None:
             name="memory-embedding-delete",
             event="memory.deleted",
             steps=[_delete_embedding_step],
+            deferred=True,
+            coalesce_key=_memory_key,
         )
     )
 
+    # Frees cached replies early; lookups already reject changed memories.
+    for event in ("memory.updated", "memory.deleted"):
+        engine.register(
+            Workflow(
+                name=f"completion-cache-invalidate-on-{event.split('.')[1]}",
+                event=event,
+                steps=[_invalidate_completions_step],
+            )
+        )
+
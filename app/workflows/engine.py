@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Any, Callable, DefaultDict, List
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, DefaultDict, Hashable, List
 
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    from .outbox import OutboxDispatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,15 +26,210 @@ class WorkflowContext:
 
 
 WorkflowStep = Callable[[WorkflowContext], None]
+CoalesceKey = Callable[[dict[str, Any]], Hashable | None]
+# Called with the tokens of a settled run, whether it succeeded, and the error.
+CompletionCallback = Callable[[List[Hashable], bool, str | None], None]
 
 
 @dataclass(slots=True)
 class Workflow:
-    """Represents a named workflow bound to a domain event."""
+    """Represents a named workflow bound to a domain event.
+
+    Deferred workflows run on the engine's background workers once they are
+    started. Pending deferred runs that share a ``coalesce_key`` collapse into
+    the most recent one and never execute concurrently.
+    """
 
     name: str
     event: str
     steps: List[WorkflowStep]
+    deferred: bool = False
+    coalesce_key: CoalesceKey | None = None
+
+
+@dataclass(slots=True)
+class _DeferredRun:
+    workflow: Workflow
+    payload: dict[str, Any]
+    key: Hashable
+    tokens: List[Hashable] = field(default_factory=list)
+    attempts: int = 0
+    ready_at: float = field(default_factory=time.monotonic)
+
+
+class DeferredWorkflowQueue:
+    """Bounded in-process queue drained by worker threads.
+
+    Each run gets its own session from ``session_factory``. Failed runs are
+    retried with exponential backoff up to ``max_attempts`` times. Runs may
+    carry opaque tokens; when a run is superseded its tokens move to the
+    replacement, and ``on_complete`` receives them once the run settles.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        workers: int,
+        max_pending: int,
+        max_attempts: int,
+        backoff_seconds: float,
+        on_complete: CompletionCallback | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._on_complete = on_complete
+        self._max_pending = max_pending
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._pending: OrderedDict[Hashable, _DeferredRun] = OrderedDict()
+        self._running: set[Hashable] = set()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"workflow-worker-{index}", daemon=True
+            )
+            for index in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        workflow: Workflow,
+        payload: dict[str, Any],
+        token: Hashable | None = None,
+    ) -> None:
+        key = workflow.coalesce_key(payload) if workflow.coalesce_key else None
+        if key is None:
+            key = object()
+        run = _DeferredRun(workflow=workflow, payload=payload, key=key)
+        if token is not None:
+            run.tokens.append(token)
+        with self._condition:
+            if key not in self._pending:
+                while len(self._pending) >= self._max_pending and not self._stopping:
+                    self._condition.wait()
+            superseded = self._pending.pop(key, None)
+            if superseded is not None:
+                run.tokens[:0] = superseded.tokens
+            self._pending[key] = run
+            self._condition.notify_all()
+
+    def free_slots(self) -> int:
+        with self._condition:
+            return max(0, self._max_pending - len(self._pending))
+
+    def idle(self) -> bool:
+        with self._condition:
+            return not self._pending and not self._running
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Block until no runs are pending or running; False on timeout."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        """Finish outstanding runs, then stop the workers."""
+
+        self.drain(timeout)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _next_run(self) -> _DeferredRun | None:
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                now = time.monotonic()
+                wait_for: float | None = None
+                for key, run in self._pending.items():
+                    if key in self._running:
+                        continue
+                    if run.ready_at <= now:
+                        del self._pending[key]
+                        self._running.add(key)
+                        self._condition.notify_all()
+                        return run
+                    delay = run.ready_at - now
+                    wait_for = delay if wait_for is None else min(wait_for, delay)
+                self._condition.wait(wait_for)
+
+    def _work(self) -> None:
+        while True:
+            run = self._next_run()
+            if run is None:
+                return
+            error: str | None = None
+            session = self._session_factory()
+            try:
+                _execute(run.workflow, WorkflowContext(session, run.payload), strict=True)
+            except Exception as exc:  # noqa: BLE001
+                error = str(exc) or type(exc).__name__
+                run.attempts += 1
+                logger.warning(
+                    "Deferred workflow '%s' failed (attempt %d/%d): %s",
+                    run.workflow.name,
+                    run.attempts,
+                    self._max_attempts,
+                    exc,
+                )
+            finally:
+                session.close()
+
+            settled = error is None
+            with self._condition:
+                newer = self._pending.get(run.key)
+                if error is not None and newer is not None:
+                    newer.tokens[:0] = run.tokens
+                elif error is not None and run.attempts < self._max_attempts:
+                    run.ready_at = time.monotonic() + self._backoff_seconds * (
+                        2 ** (run.attempts - 1)
+                    )
+                    self._pending[run.key] = run
+                elif error is not None:
+                    settled = True
+                    logger.error(
+                        "Deferred workflow '%s' gave up after %d attempts",
+                        run.workflow.name,
+                        run.attempts,
+                    )
+            if settled and self._on_complete is not None and run.tokens:
+                try:
+                    self._on_complete(run.tokens, error is None, error)
+                except Exception:  # noqa: BLE001
+                    logger.exception("Deferred workflow completion callback failed")
+            with self._condition:
+                self._running.discard(run.key)
+                self._condition.notify_all()
+
+
+def _execute(workflow: Workflow, context: WorkflowContext, *, strict: bool) -> None:
+    """Run a workflow's steps; ``strict`` re-raises the first failure."""
+
+    for step in workflow.steps:
+        step_name = getattr(step, "__name__", repr(step))
+        try:
+            step(context)
+        except Exception as exc:  # noqa: BLE001
+            if strict:
+                raise
+            logger.exception(
+                "Workflow '%s' step '%s' failed: %s",
+                workflow.name,
+                step_name,
+                exc,
+            )
 
 
 class WorkflowEngine:
@@ -37,6 +237,8 @@ class WorkflowEngine:
 
     def __init__(self) -> None:
         self._registry: DefaultDict[str, List[Workflow]] = defaultdict(list)
+        self._queue: DeferredWorkflowQueue | None = None
+        self._outbox: OutboxDispatcher | None = None
 
     def clear(self) -> None:
         """Remove all registered workflows (primarily for tests)."""
@@ -54,6 +256,68 @@ class WorkflowEngine:
             len(workflow.steps),
         )
 
+    def deferred_workflows(self, event: str) -> List[Workflow]:
+        return [workflow for workflow in self._registry.get(event, []) if workflow.deferred]
+
+    def start(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        workers: int = 2,
+        max_pending: int = 1000,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.5,
+        outbox: OutboxDispatcher | None = None,
+    ) -> None:
+        """Start background workers for deferred workflows.
+
+        Until this is called, deferred workflows run inline like any other.
+        With an ``outbox`` dispatcher, deferred workflows are fed from the
+        durable ``workflow_events`` table instead of from ``trigger``.
+        """
+
+        if self._queue is not None:
+            return
+        self._queue = DeferredWorkflowQueue(
+            session_factory,
+            workers=workers,
+            max_pending=max_pending,
+            max_attempts=max_attempts,
+            backoff_seconds=backoff_seconds,
+            on_complete=outbox.on_complete if outbox is not None else None,
+        )
+        if outbox is not None:
+            outbox.start(self._queue)
+            self._outbox = outbox
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Wait for queued deferred workflows to finish (tests, shutdown)."""
+
+        if self._queue is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._queue.drain(remaining):
+                return False
+            if self._outbox is None:
+                return True
+            # dispatch_once serializes with the dispatcher thread, so once it
+            # finds nothing new, every claimed event is already in the queue.
+            if not self._outbox.dispatch_once() and self._queue.idle():
+                return True
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        """Drain deferred workflows and stop the workers."""
+
+        if self._queue is None:
+            return
+        if self._outbox is not None:
+            self._outbox.stop(timeout)
+            self._outbox = None
+        self._queue.shutdown(timeout)
+        self._queue = None
+
     def trigger(
         self,
         event: str,
@@ -70,16 +334,14 @@ class WorkflowEngine:
 
         context = WorkflowContext(session=session, payload=payload or {})
         for workflow in workflows:
+            if workflow.deferred and self._outbox is not None:
+                # The event row was committed with the change; just wake the
+                # dispatcher so it is picked up without waiting for a poll.
+                self._outbox.wake()
+                continue
+            if workflow.deferred and self._queue is not None:
+                logger.debug("Deferring workflow '%s' for event '%s'", workflow.name, event)
+                self._queue.submit(workflow, dict(context.payload))
+                continue
             logger.debug("Executing workflow '%s' for event '%s'", workflow.name, event)
-            for step in workflow.steps:
-                step_name = getattr(step, "__name__", repr(step))
-                try:
-                    step(context)
-                except Exception as exc:  # noqa: BLE001
-                    logger.exception(
-                        "Workflow '%s' step '%s' failed: %s",
-                        workflow.name,
-                        step_name,
-                        exc,
-                    )
-
+            _execute(workflow, context, strict=False)
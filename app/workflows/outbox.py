@@ -0,0 +1,144 @@
+"""Dispatcher that feeds durable outbox events into the deferred queue."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Hashable, List
+
+from sqlalchemy.orm import Session
+
+from app.repositories import WorkflowEventRepository
+
+if TYPE_CHECKING:
+    from .engine import DeferredWorkflowQueue, WorkflowEngine
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """Claims ``workflow_events`` rows and settles them once their runs finish.
+
+    Every event is submitted once per deferred workflow registered for it,
+    tagged with the event id. The row is deleted when all of those runs
+    succeed, or released with backoff if any of them gives up, so indexing is
+    at-least-once across restarts and worker processes.
+    """
+
+    def __init__(
+        self,
+        engine: "WorkflowEngine",
+        session_factory: Callable[[], Session],
+        *,
+        batch_size: int,
+        lease_seconds: float,
+        poll_interval_seconds: float,
+        max_attempts: int,
+        retry_delay_seconds: float,
+    ) -> None:
+        self._engine = engine
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval_seconds
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay_seconds
+        self._queue: "DeferredWorkflowQueue | None" = None
+        self._outstanding: Counter[int] = Counter()
+        self._failures: dict[int, str] = {}
+        self._state_lock = threading.Lock()
+        self._claim_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="workflow-outbox", daemon=True
+        )
+
+    def start(self, queue: "DeferredWorkflowQueue") -> None:
+        self._queue = queue
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def dispatch_once(self) -> int:
+        """Claim and submit one batch of due events; return how many."""
+
+        if self._queue is None:
+            return 0
+        with self._claim_lock:
+            limit = min(self._batch_size, self._queue.free_slots())
+            if limit <= 0:
+                return 0
+            session = self._session_factory()
+            try:
+                events = WorkflowEventRepository(session).claim(
+                    limit=limit,
+                    lease_seconds=self._lease_seconds,
+                    max_attempts=self._max_attempts,
+                )
+                claimed = [(event.id, event.event, dict(event.payload)) for event in events]
+            finally:
+                session.close()
+
+            settled_now: List[int] = []
+            for event_id, name, payload in claimed:
+                workflows = self._engine.deferred_workflows(name)
+                if not workflows:
+                    settled_now.append(event_id)
+                    continue
+                with self._state_lock:
+                    self._outstanding[event_id] += len(workflows)
+                for workflow in workflows:
+                    self._queue.submit(workflow, payload, token=event_id)
+            if settled_now:
+                self._settle(settled_now, [])
+            return len(claimed)
+
+    def on_complete(self, tokens: List[Hashable], succeeded: bool, error: str | None) -> None:
+        """Queue callback: settle events whose runs have all finished."""
+
+        done: List[int] = []
+        failed: List[int] = []
+        with self._state_lock:
+            for token in tokens:
+                event_id = int(token)  # type: ignore[arg-type]
+                if not succeeded:
+                    self._failures[event_id] = error or "failed"
+                self._outstanding[event_id] -= 1
+                if self._outstanding[event_id] > 0:
+                    continue
+                del self._outstanding[event_id]
+                if event_id in self._failures:
+                    failed.append(event_id)
+                else:
+                    done.append(event_id)
+            errors = [self._failures.pop(event_id) for event_id in failed]
+        self._settle(done, failed, errors[0] if errors else None)
+
+    def _settle(self, done: List[int], failed: List[int], error: str | None = None) -> None:
+        session = self._session_factory()
+        try:
+            repo = WorkflowEventRepository(session)
+            repo.complete(done)
+            repo.release(failed, delay_seconds=self._retry_delay, error=error)
+        finally:
+            session.close()
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = self.dispatch_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to claim workflow events")
+                claimed = 0
+            if claimed:
+                continue
+            self._wakeup.wait(self._poll_interval)
+            self._wakeup.clear()
@@ -20,7 +20,7 @@ Commands:
   docker           Build and run the backend container (delegates to run_docker.sh)
   test             Run pytest within the virtual environment
   format           Format backend code with ruff (if installed)
-  rag-reindex      Regenerate embeddings for all memories (RAG index)
+  rag-reindex      Regenerate embeddings (RAG index); options as in python -m app.cli reindex
   help             Show this help message
 
 Environment variables:
@@ -106,23 +106,8 @@ function cmd_format() {
 
 function cmd_rag_reindex() {
   ensure_venv
-  log "Rebuilding RAG embeddings for all memories"
-  python <<'PYCODE'
-from app.database import SessionLocal
-from app.repositories import MemoryRepository
-from app.services.rag_service import RAGService
-
-session = SessionLocal()
-try:
-    repo = MemoryRepository(session)
-    rag = RAGService(session)
-    memories = repo.list_all()
-    for memory in memories:
-        rag.index_memory(memory)
-    print(f"[minddock] Re-indexed {len(memories)} memories")
-finally:
-    session.close()
-PYCODE
+  log "Rebuilding RAG embeddings"
+  python -m app.cli reindex "$@"
 }
 
 COMMAND="${1:-help}"
@@ -0,0 +1,83 @@
+"""Compare IVF approximate search against exact search on synthetic vectors.
+
+Usage: python scripts/rag_ann_report.py [--size N] [--dim D] [--queries Q]
+
+Prints recall@k and mean per-query latency for the exact path and several
+``nprobe`` settings, using clustered data that resembles text embeddings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.vector_cache import OwnerVectors  # noqa: E402
+
+
+def _synthetic(size: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=size)
+    noise = rng.standard_normal((size, dim)).astype(np.float32) * 2.0
+    return centers[labels] + noise
+
+
+def _timed(vectors: OwnerVectors, queries: np.ndarray, k: int, nprobe: int | None):
+    results = []
+    started = time.perf_counter()
+    for query in queries:
+        results.append([hit[0] for hit in vectors.top_k(query, k, nprobe=nprobe)])
+    elapsed = (time.perf_counter() - started) / len(queries)
+    return results, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = _synthetic(args.size, args.dim, clusters=max(16, args.size // 500), rng=rng)
+    records = [
+        SimpleNamespace(
+            memory_id=uuid.uuid4(),
+            embedding=row.tobytes(),
+            embedding_dim=args.dim,
+            embedding_dtype="float32",
+        )
+        for row in data
+    ]
+    vectors = OwnerVectors.from_records(records, model="synthetic", fingerprint=(len(records), None))
+    queries = data[rng.choice(args.size, size=args.queries, replace=False)]
+    queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.3
+
+    exact, exact_latency = _timed(vectors, queries, args.k, nprobe=None)
+
+    started = time.perf_counter()
+    vectors.ensure_ivf(min_size=0)
+    build_seconds = time.perf_counter() - started
+
+    print(f"vectors={args.size} dim={args.dim} k={args.k} queries={args.queries}")
+    print(f"ivf build: {build_seconds:.2f}s")
+    print(f"{'mode':<14}{'recall@k':>10}{'ms/query':>12}")
+    print(f"{'exact':<14}{1.0:>10.3f}{exact_latency * 1000:>12.2f}")
+    for nprobe in (1, 4, 8, 16, 32, 64):
+        approx, latency = _timed(vectors, queries, args.k, nprobe=nprobe)
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+        recall = hits / (args.k * len(exact))
+        print(f"{'ivf/' + str(nprobe):<14}{recall:>10.3f}{latency * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()